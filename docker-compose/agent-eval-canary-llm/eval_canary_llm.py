@@ -20,6 +20,7 @@ import uuid
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
 
+import grpc
 from opensearch_genai_observability_sdk_py.retrieval import OpenSearchTraceRetriever
 from opensearch_genai_observability_sdk_py.score import score
 from opentelemetry import trace
@@ -62,7 +63,7 @@ def setup_otel() -> TracerProvider:
     resource = Resource.create({"service.name": "agent-eval-canary-llm"})
     provider = TracerProvider(resource=resource)
     provider.add_span_processor(
-        BatchSpanProcessor(OTLPSpanExporter(endpoint=OTEL_ENDPOINT, insecure=True))
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=OTEL_ENDPOINT, insecure=True, compression=grpc.Compression.Gzip))
     )
     trace.set_tracer_provider(provider)
     return provider
@@ -189,7 +190,7 @@ def run() -> None:
     recently_scored: dict[str, float] = {}  # trace_id -> timestamp
 
     while True:
-        cycle_start = time.time()
+        cycle_start = time.monotonic()
         try:
             # Expire entries older than lookback window
             cutoff = time.time() - (LOOKBACK_MINUTES * 60)
@@ -230,11 +231,11 @@ def run() -> None:
                             else:
                                 log.warning("Failed %s → %s", tid[:12], res)
                     tp.force_flush(timeout_millis=10000)
-                    log.info("Cycle done in %.1fs, ok=%d/%d", time.time() - cycle_start, ok, len(pending))
+                    log.info("Cycle done in %.1fs, ok=%d/%d", time.monotonic() - cycle_start, ok, len(pending))
         except Exception:
             log.exception("Cycle failed")
 
-        elapsed = time.time() - cycle_start
+        elapsed = time.monotonic() - cycle_start
         sleep_for = max(0, INTERVAL - elapsed)
         if sleep_for:
             time.sleep(sleep_for)
@@ -10,12 +10,13 @@ import logging
 import os
 import time
 
+import grpc
 from opensearch_genai_observability_sdk_py.retrieval import OpenSearchTraceRetriever
 from opensearch_genai_observability_sdk_py.score import score
 
 from opentelemetry import trace
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.sdk.resources import Resource
 
@@ -44,8 +45,10 @@ TARGET_SERVICES = [
 def setup_otel() -> TracerProvider:
     resource = Resource.create({"service.name": "agent-eval-canary"})
     provider = TracerProvider(resource=resource)
+    # Batched: each trace yields four score spans, and the poll loop flushes
+    # once per cycle instead of blocking on an export for every span
     provider.add_span_processor(
-        SimpleSpanProcessor(OTLPSpanExporter(endpoint=OTEL_ENDPOINT, insecure=True))
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=OTEL_ENDPOINT, insecure=True, compression=grpc.Compression.Gzip))
     )
     trace.set_tracer_provider(provider)
     return provider
@@ -259,7 +262,7 @@ def run() -> None:
                             recently_scored[root.trace_id] = time.time()
                         except Exception:
                             log.exception("Failed to eval trace %s", root.trace_id[:12])
-                    provider.force_flush()
+                    provider.force_flush(timeout_millis=10000)
         except Exception:
             log.exception("Poll cycle failed")
 
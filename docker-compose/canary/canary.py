@@ -8,7 +8,7 @@ interval). Falls back to env-var defaults if the panel is unreachable.
 Generates traces with varying depths and shapes:
 - "normal": standard orchestrator call (40+ spans, 5 services, includes flights + currency)
 - "shallow": direct sub-agent call bypassing orchestrator (5-8 spans, 1-2 services)
-- "deep": multi-destination comparison via sequential orchestrator calls (100+ spans)
+- "deep": multi-destination comparison via concurrent orchestrator calls (100+ spans)
 """
 
 import json
@@ -16,7 +16,9 @@ import os
 import random
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 
 
 TRAVEL_PLANNER_URL = os.getenv("TRAVEL_PLANNER_URL", "http://travel-planner:8000")
@@ -25,6 +27,12 @@ EVENTS_AGENT_URL = os.getenv("EVENTS_AGENT_URL", "http://events-agent:8002")
 FAULT_PANEL_URL = os.getenv("FAULT_PANEL_URL", "http://fault-panel:8085")
 CANARY_INTERVAL = int(os.getenv("CANARY_INTERVAL", "30"))
 
+# One keep-alive session for every call; the pool covers the deep shape's
+# concurrent plans. No retries: failures are what the canary reports.
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 DESTINATIONS = ["Paris", "Tokyo", "London", "Berlin", "Sydney", "New York", "Mumbai", "Seattle"]
 ORIGINS = ["Portland", "Seattle", "San Francisco", "New York", "Chicago", "Denver", "Austin", "Boston"]
 
@@ -65,7 +73,7 @@ def weighted_choice(weights_dict):
 def fetch_config():
     """Poll fault panel for current config. Returns None if unreachable."""
     try:
-        resp = requests.get(f"{FAULT_PANEL_URL}/config", timeout=2)
+        resp = session.get(f"{FAULT_PANEL_URL}/config", timeout=2)
         if resp.status_code == 200:
             return resp.json()
     except Exception:
@@ -98,7 +106,7 @@ def select_fault(fault_weights):
 
 def check_health():
     try:
-        response = requests.get(f"{TRAVEL_PLANNER_URL}/health", timeout=5)
+        response = session.get(f"{TRAVEL_PLANNER_URL}/health", timeout=5)
         response.raise_for_status()
         print(f"✓ Travel planner is healthy")
         return True
@@ -116,7 +124,7 @@ def invoke_normal(destination, fault_weights):
         payload["fault"] = fault_config
 
     print(f"  [normal] {origin} → {destination} (fault: {fault_name})")
-    response = requests.post(f"{TRAVEL_PLANNER_URL}/plan", json=payload, timeout=60)
+    response = session.post(f"{TRAVEL_PLANNER_URL}/plan", json=payload, timeout=60)
     data = response.json()
 
     if response.status_code == 200:
@@ -147,7 +155,7 @@ def invoke_shallow(destination):
         payload = {"destination": destination}
 
     print(f"  [shallow] {destination} → {agent}-agent")
-    response = requests.post(url, json=payload, timeout=30)
+    response = session.post(url, json=payload, timeout=30)
 
     if response.status_code == 200:
         print(f"            → ok")
@@ -156,19 +164,26 @@ def invoke_shallow(destination):
     return False
 
 
+def plan_destination(dest, origin):
+    """Single orchestrator call for invoke_deep; True on HTTP 200."""
+    payload = {"destination": dest, "origin": origin}
+    try:
+        response = session.post(f"{TRAVEL_PLANNER_URL}/plan", json=payload, timeout=60)
+        return response.status_code == 200
+    except Exception:
+        return False
+
+
 def invoke_deep(destinations):
-    """Sequential multi-destination calls — produces deep traces."""
+    """Concurrent multi-destination calls — produces deep traces.
+
+    The per-destination plans are independent, so they run in parallel and the
+    comparison takes as long as the slowest plan rather than the sum of all.
+    """
     origin = random.choice(ORIGINS)
     print(f"  [deep] comparing {len(destinations)} destinations from {origin}: {', '.join(destinations)}")
-    results = 0
-    for dest in destinations:
-        payload = {"destination": dest, "origin": origin}
-        try:
-            response = requests.post(f"{TRAVEL_PLANNER_URL}/plan", json=payload, timeout=60)
-            if response.status_code == 200:
-                results += 1
-        except Exception:
-            pass
+    with ThreadPoolExecutor(max_workers=len(destinations)) as pool:
+        results = sum(pool.map(plan_destination, destinations, [origin] * len(destinations)))
     print(f"          → {results}/{len(destinations)} succeeded")
     return results > 0
 
@@ -6,9 +6,15 @@ with OpenTelemetry to send telemetry data to the Observability Stack
 using OTLP protocol.
 """
 
+import asyncio
 from typing import Any
 
+import boto3
+from botocore.config import Config
 from langchain_aws import ChatBedrockConverse
+from langchain_core.caches import InMemoryCache
+from langchain_core.globals import set_llm_cache
+from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
@@ -81,6 +87,31 @@ def setup_telemetry(
     print()
 
 
+# ============================================================================
+# LLM RESPONSE CACHE
+# ============================================================================
+
+
+class TracedInMemoryCache(InMemoryCache):
+    """
+    In-process LLM response cache that records lookups on the current span.
+
+    Identical (prompt, model settings) pairs are answered from memory and
+    skip the Bedrock Converse call. Each lookup adds a span event with a
+    hit/miss flag so the cache hit rate can be measured from traces.
+    For multi-process deployments, swap this for a shared cache backend
+    (e.g. a Redis-backed BaseCache).
+    """
+
+    def lookup(self, prompt: str, llm_string: str) -> Any:
+        result = super().lookup(prompt, llm_string)
+        trace.get_current_span().add_event(
+            "gen_ai.cache.lookup",
+            {"gen_ai.cache.hit": result is not None},
+        )
+        return result
+
+
 # ============================================================================
 # TOOL DEFINITIONS
 # ============================================================================
@@ -108,6 +139,18 @@ def calculate_growth(initial_value: float, rate: float, years: int) -> float:
     return initial_value * (1 + rate) ** years
 
 
+# Bedrock runtime client settings: a larger connection pool so concurrent
+# invocations sharing one agent don't queue on connections
+BEDROCK_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={"max_attempts": 2},
+)
+
+# Tools available to the agent, indexed by name for tool-call dispatch
+TOOLS = [calculate_growth]
+TOOLS_BY_NAME = {t.name: t for t in TOOLS}
+
+
 # ============================================================================
 # AGENT CONFIGURATION
 # ============================================================================
@@ -148,20 +191,28 @@ def create_agent(
     llm = ChatBedrockConverse(
         model_id=model_id,
         temperature=0,
+        client=boto3.client("bedrock-runtime", config=BEDROCK_CLIENT_CONFIG),
     )
 
     # Bind tools to the model
     # This enables the model to call tools during execution
-    tools = [calculate_growth]
-    llm_with_tools = llm.bind_tools(tools)
+    llm_with_tools = llm.bind_tools(TOOLS)
 
     # Create prompt template
-    # The agent will use this to structure its reasoning
+    # The agent will use this to structure its reasoning.
+    # The system message is identical on every call, so a Bedrock cache point
+    # is placed after it: tool definitions + system prompt form a stable
+    # prefix that Bedrock can serve from its prompt cache on repeat calls.
     prompt = ChatPromptTemplate.from_messages([
-        (
-            "system",
-            "You are a helpful financial assistant. "
-            "Use tools for precise math calculations.",
+        SystemMessage(
+            content=[
+                {
+                    "type": "text",
+                    "text": "You are a helpful financial assistant. "
+                    "Use tools for precise math calculations.",
+                },
+                ChatBedrockConverse.create_cache_point(),
+            ]
         ),
         ("human", "{input}"),
     ])
@@ -178,7 +229,7 @@ def create_agent(
 # ============================================================================
 
 
-def run_agent(query: str) -> None:
+async def run_agent(agent: Any, query: str) -> None:
     """
     Executes the agent with a query and automatic telemetry.
 
@@ -188,18 +239,19 @@ def run_agent(query: str) -> None:
     - Tool execution spans
     - Chain step spans
 
+    Tool calls returned by the model are independent of each other, so
+    they are executed concurrently rather than one after another.
+
     The telemetry data flows:
     LangChain → OpenTelemetry → OTLP Exporter →
     OTel Collector → Data Prepper → OpenSearch
 
     Args:
+        agent: Agent runnable returned by create_agent()
         query: User's question or task
     """
     print(f"\n📝 Query: {query}\n")
 
-    # Create agent
-    agent = create_agent()
-
     # Configure runnable with callbacks for better observability
     config = RunnableConfig(
         run_name="financial_assistant",
@@ -209,7 +261,7 @@ def run_agent(query: str) -> None:
     try:
         # Invoke the agent
         # This creates a complete trace with all operations
-        result = agent.invoke({"input": query}, config=config)
+        result = await agent.ainvoke({"input": query}, config=config)
 
         # Extract the response
         # Handle both tool calls and direct responses
@@ -218,15 +270,18 @@ def run_agent(query: str) -> None:
             for tool_call in result.tool_calls:
                 print(f"  - {tool_call['name']}: {tool_call['args']}")
 
-            # Execute tools and get final response
+            # Execute tools concurrently and get final response
             # In a real implementation, you'd use AgentExecutor
             # or implement a tool execution loop
-            tool_results = []
-            for tool_call in result.tool_calls:
-                if tool_call["name"] == "calculate_growth":
-                    tool_result = calculate_growth.invoke(tool_call["args"])
-                    tool_results.append(tool_result)
-                    print(f"  → Result: ${tool_result:,.2f}")
+            tool_calls = [
+                tc for tc in result.tool_calls if tc["name"] in TOOLS_BY_NAME
+            ]
+            tool_results = await asyncio.gather(*(
+                TOOLS_BY_NAME[tc["name"]].ainvoke(tc["args"])
+                for tc in tool_calls
+            ))
+            for tool_result in tool_results:
+                print(f"  → Result: ${tool_result:,.2f}")
 
             print(f"\n✅ Final Answer: ${tool_results[0]:,.2f}")
         else:
@@ -264,6 +319,9 @@ def main() -> None:
     print("=" * 60)
     print()
 
+    # Cache LLM responses so repeated queries skip the Bedrock call
+    set_llm_cache(TracedInMemoryCache())
+
     # Step 1: Set up OpenTelemetry instrumentation
     # This configures the OTLP exporter and instruments LangChain
     print("Setting up OpenTelemetry instrumentation...")
@@ -277,10 +335,12 @@ def main() -> None:
     print("   View traces at: http://localhost:5601")
     print("   (OpenSearch Dashboards)\n")
 
-    # Step 2: Run the agent
+    # Step 2: Create the agent once and run it
+    # The model client, tool binding and prompt are reused across queries
     # LangChain operations are automatically instrumented via callback handler
+    agent = create_agent()
     query = "If I invest $10,000 at 7% for 5 years, what will it be worth?"
-    run_agent(query)
+    asyncio.run(run_agent(agent, query))
 
     # Step 3: Clean up instrumentation
     # Uninstrument LangChain to remove callback handler
@@ -8,18 +8,21 @@ Instrumented with opensearch-genai-observability-sdk-py:
 - observe() + enrich() replace manual span creation + set_attribute() calls
 """
 
+import datetime
+import functools
+import itertools
 import json
 import os
 import random
 import threading
 import time
-from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
 import httpx
+import orjson
 import requests as req_lib
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from opentelemetry import trace, metrics
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.sdk.metrics import MeterProvider
@@ -40,6 +43,15 @@ from bedrock_client import (
 # MCP Server configuration
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://mcp-server:8003")
 MCP_PROTOCOL_VERSION = "2025-06-18"
+# MCP requests are sent as pre-encoded JSON bytes, so the content type is set explicitly
+MCP_BASE_HEADERS = {"content-type": "application/json"}
+# Attributes shared by every MCP tools/call client span
+MCP_CLIENT_SPAN_ATTRIBUTES = {
+    "mcp.method.name": "tools/call",
+    "mcp.protocol.version": MCP_PROTOCOL_VERSION,
+    "network.transport": "tcp",
+    "network.protocol.name": "http",
+}
 FAULT_PANEL_URL = os.getenv("FAULT_PANEL_URL", "http://fault-panel:8085")
 
 _config_cache = {"use_real_llm": False}
@@ -64,6 +76,9 @@ _bedrock_client = get_bedrock_client()
 AGENT_ID = "events-agent-001"
 AGENT_NAME = "Events Agent"
 
+# Fixed gen_ai attributes promoted to the root HTTP span on every request
+ROOT_SPAN_ATTRIBUTES = {"gen_ai.agent.name": AGENT_NAME, "gen_ai.operation.name": "invoke_agent"}
+
 # Tool definitions for this agent
 TOOL_DEFINITIONS = [
     {
@@ -76,22 +91,16 @@ TOOL_DEFINITIONS = [
     }
 ]
 
-# Model rotation for realistic traces
-MODELS = [
-    "claude-opus-4.5", "claude-sonnet-4.5", "claude-haiku-4.5", "claude-sonnet-4", "claude-haiku",
-    "gpt-5", "gpt-4.1", "gpt-4.1-mini", "gpt-4o", "gpt-4o-mini", "o4-mini",
-    "gemini-3-flash", "gemini-2.5-pro", "gemini-2.5-flash",
-    "nova-2-pro", "nova-2-lite", "nova-premier", "nova-pro", "nova-lite",
-]
-SYSTEMS = {
-    "claude-opus-4.5": "anthropic", "claude-sonnet-4.5": "anthropic", "claude-haiku-4.5": "anthropic",
-    "claude-sonnet-4": "anthropic", "claude-haiku": "anthropic",
-    "gpt-5": "openai", "gpt-4.1": "openai", "gpt-4.1-mini": "openai",
-    "gpt-4o": "openai", "gpt-4o-mini": "openai", "o4-mini": "openai",
-    "gemini-3-flash": "google", "gemini-2.5-pro": "google", "gemini-2.5-flash": "google",
-    "nova-2-pro": "amazon", "nova-2-lite": "amazon", "nova-premier": "amazon",
-    "nova-pro": "amazon", "nova-lite": "amazon",
-}
+# Model rotation for realistic traces, paired with each model's provider
+MODEL_PROVIDERS = (
+    ("claude-opus-4.5", "anthropic"), ("claude-sonnet-4.5", "anthropic"), ("claude-haiku-4.5", "anthropic"),
+    ("claude-sonnet-4", "anthropic"), ("claude-haiku", "anthropic"),
+    ("gpt-5", "openai"), ("gpt-4.1", "openai"), ("gpt-4.1-mini", "openai"),
+    ("gpt-4o", "openai"), ("gpt-4o-mini", "openai"), ("o4-mini", "openai"),
+    ("gemini-3-flash", "google"), ("gemini-2.5-pro", "google"), ("gemini-2.5-flash", "google"),
+    ("nova-2-pro", "amazon"), ("nova-2-lite", "amazon"), ("nova-premier", "amazon"),
+    ("nova-pro", "amazon"), ("nova-lite", "amazon"),
+)
 
 SAMPLE_EVENTS = {
     "paris": [
@@ -136,6 +145,13 @@ SAMPLE_EVENTS = {
     ],
 }
 
+# Every ordered pair of events per city, so the wrong_city fault can pick a
+# sample with a single random.choice instead of random.sample per request
+SAMPLE_EVENT_PAIRS = {
+    city: tuple(itertools.permutations(evts, min(len(evts), 2)))
+    for city, evts in SAMPLE_EVENTS.items()
+}
+
 
 class FaultConfig(BaseModel):
     type: str = Field(..., description="Fault type: timeout, error, rate_limited, high_latency, wrong_city, empty")
@@ -163,15 +179,34 @@ class EventsResponse(BaseModel):
     agent_id: str
 
 
-class ErrorResponse(BaseModel):
-    error: dict
-    destination: str
-    agent_id: str
+# Pre-encoded EventsResponse and error bodies ({error, destination, agent_id})
+# for the fault branches.
+# Only the destination varies, so it is substituted into the %s slot.
+_AGENT_ID_JSON = orjson.dumps(AGENT_ID)
+EMPTY_EVENTS_TEMPLATE = b'{"destination":%s,"events":[],"agent_id":' + _AGENT_ID_JSON + b"}"
+ERROR_TEMPLATES = {
+    fault_type: b'{"error":' + orjson.dumps(error) + b',"destination":%s,"agent_id":' + _AGENT_ID_JSON + b"}"
+    for fault_type, error in {
+        "timeout": {"type": "timeout", "message": "Events lookup timed out"},
+        "error": {"type": "tool_error", "message": "Events API returned an error"},
+        "rate_limited": {"type": "rate_limited", "message": "Events API rate limit exceeded"},
+    }.items()
+}
+
+
+def json_template_response(template: bytes, destination: str) -> Response:
+    return Response(content=template % orjson.dumps(destination), media_type="application/json")
 
 
 # --- Telemetry setup ---
 otlp_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
 
+# Head sampling: set OTEL_TRACES_SAMPLER_ARG (e.g. 0.1) to keep only that
+# fraction of traces. register() creates a default TracerProvider, which picks
+# its sampler from the standard OTEL_TRACES_SAMPLER/_ARG environment variables.
+if os.getenv("OTEL_TRACES_SAMPLER_ARG"):
+    os.environ.setdefault("OTEL_TRACES_SAMPLER", "parentbased_traceidratio")
+
 # One line replaces ~20 lines of TracerProvider + exporter setup
 register(
     endpoint=f"grpc://{otlp_endpoint.replace('http://', '').replace('https://', '')}",
@@ -192,6 +227,16 @@ metrics.set_meter_provider(meter_provider)
 inner_app = FastAPI(title="Events Agent", version="1.0.0")
 
 
+@functools.lru_cache(maxsize=1)
+def _format_day(ordinal: int) -> str:
+    return datetime.date.fromordinal(ordinal).isoformat()
+
+
+def today_str() -> str:
+    """Today's date as YYYY-MM-DD, formatted once per day."""
+    return _format_day(datetime.date.today().toordinal())
+
+
 def should_inject_fault(fault: Optional[FaultConfig]) -> bool:
     if not fault:
         return False
@@ -205,8 +250,7 @@ async def health():
 
 @inner_app.post("/events")
 async def get_events(request: EventsRequest):
-    model = random.choice(MODELS)
-    provider = SYSTEMS[model]
+    model, provider = random.choice(MODEL_PROVIDERS)
 
     # Promote gen_ai attributes to the root HTTP span so the UI can read them
     enrich(
@@ -216,8 +260,7 @@ async def get_events(request: EventsRequest):
         input_messages=[{"role": "user", "parts": [{"type": "text", "content": f"Find events in {request.destination}"}]}],
     )
     root_span = trace.get_current_span()
-    root_span.set_attribute("gen_ai.agent.name", AGENT_NAME)
-    root_span.set_attribute("gen_ai.operation.name", "invoke_agent")
+    root_span.set_attributes(ROOT_SPAN_ATTRIBUTES)
 
     with observe(AGENT_NAME, op=Op.INVOKE_AGENT) as span:
         enrich(
@@ -228,7 +271,7 @@ async def get_events(request: EventsRequest):
         )
 
         destination = request.destination.lower()
-        date = request.date or datetime.now().strftime("%Y-%m-%d")
+        date = request.date or today_str()
         fault = request.fault
 
         # LLM reasoning call
@@ -271,63 +314,46 @@ async def get_events(request: EventsRequest):
             elif fault.type == "timeout":
                 span.set_status(Status(StatusCode.ERROR, "Tool execution timed out"))
                 time.sleep(30)
-                return ErrorResponse(
-                    error={"type": "timeout", "message": "Events lookup timed out"},
-                    destination=request.destination,
-                    agent_id=AGENT_ID,
-                )
+                return json_template_response(ERROR_TEMPLATES["timeout"], request.destination)
 
             elif fault.type == "error":
                 span.set_status(Status(StatusCode.ERROR, "Events API error"))
-                return ErrorResponse(
-                    error={"type": "tool_error", "message": "Events API returned an error"},
-                    destination=request.destination,
-                    agent_id=AGENT_ID,
-                )
+                return json_template_response(ERROR_TEMPLATES["error"], request.destination)
 
             elif fault.type == "rate_limited":
                 span.set_status(Status(StatusCode.ERROR, "Rate limited"))
-                return ErrorResponse(
-                    error={"type": "rate_limited", "message": "Events API rate limit exceeded"},
-                    destination=request.destination,
-                    agent_id=AGENT_ID,
-                )
+                return json_template_response(ERROR_TEMPLATES["rate_limited"], request.destination)
 
             elif fault.type == "wrong_city":
                 wrong = fault.wrong_city or random.choice([c for c in SAMPLE_EVENTS.keys() if c != destination])
                 span.set_attribute("fault.wrong_city", wrong)
-                events_data = SAMPLE_EVENTS.get(wrong, SAMPLE_EVENTS["paris"])
-                selected = random.sample(events_data, min(len(events_data), 2))
+                selected = random.choice(SAMPLE_EVENT_PAIRS.get(wrong, SAMPLE_EVENT_PAIRS["paris"]))
                 events = [Event(name=e["name"], type=e["type"], venue=e["venue"], date=date) for e in selected]
                 return EventsResponse(destination=request.destination, events=events, agent_id=AGENT_ID)
 
             elif fault.type == "empty":
-                return EventsResponse(destination=request.destination, events=[], agent_id=AGENT_ID)
+                return json_template_response(EMPTY_EVENTS_TEMPLATE, request.destination)
 
         # Tool execution via MCP server
         session_id = uuid4().hex
-        request_id = uuid4().hex[:8]
+        request_id = session_id[:8]
 
         # MCP tool call — uses observe() for the span, with MCP-specific attributes set manually
         with observe("fetch_events_api", op=Op.EXECUTE_TOOL, kind=SpanKind.CLIENT) as tool_span:
-            tool_span.set_attribute("mcp.method.name", "tools/call")
-            tool_span.set_attribute("mcp.session.id", session_id)
-            tool_span.set_attribute("mcp.protocol.version", MCP_PROTOCOL_VERSION)
-            tool_span.set_attribute("jsonrpc.request.id", request_id)
-            tool_span.set_attribute("network.transport", "tcp")
-            tool_span.set_attribute("network.protocol.name", "http")
+            tool_span.set_attributes(MCP_CLIENT_SPAN_ATTRIBUTES)
+            tool_span.set_attributes({"mcp.session.id": session_id, "jsonrpc.request.id": request_id})
 
             enrich(
                 input_messages=[{"role": "tool_call", "parts": [{"type": "text", "content": json.dumps({"destination": destination})}]}],
             )
 
-            headers = {"mcp-session-id": session_id}
+            headers = {**MCP_BASE_HEADERS, "mcp-session-id": session_id}
             inject(headers)
-            payload = {
+            payload = orjson.dumps({
                 "jsonrpc": "2.0", "method": "tools/call", "id": request_id,
                 "params": {"name": "fetch_events_api", "arguments": {"destination": destination}}
-            }
-            resp = httpx.post(f"{MCP_SERVER_URL}/mcp", json=payload, headers=headers, timeout=30)
+            })
+            resp = httpx.post(f"{MCP_SERVER_URL}/mcp", content=payload, headers=headers, timeout=30)
             mcp_result = resp.json().get("result", {})
             events_list = mcp_result.get("events", [])
             events = [Event(name=e["name"], type=e.get("type", "attraction"), venue=e.get("venue", destination.title()), date=e.get("date", date)) for e in events_list]
@@ -10,22 +10,25 @@ Uses real free APIs (no API keys required):
 - Mock data for flights (no free flight API exists)
 """
 
+import itertools
 import os
 import random
-import time
-from uuid import uuid4
 
 import httpx
+import orjson
 from fastapi import FastAPI, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
 from opentelemetry import trace
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.trace import SpanKind, Status, StatusCode
-from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.propagate import extract
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from typing import Optional
 
 MCP_PROTOCOL_VERSION = "2025-06-18"
@@ -78,14 +81,37 @@ WMO_WEATHER_CODES = {
 
 AIRLINES = ["United", "Delta", "Alaska", "Southwest", "JetBlue", "American", "Spirit", "Frontier"]
 
+# Fallback attractions as (name template, type); a random ordering is sliced
+# per request instead of building every event and calling random.sample
+FALLBACK_EVENT_TEMPLATES = (
+    ("{dst} City Tour", "tour"),
+    ("{dst} Food Festival", "food"),
+    ("Live Music in {dst}", "music"),
+)
+FALLBACK_EVENT_ORDERS = tuple(itertools.permutations(range(len(FALLBACK_EVENT_TEMPLATES))))
+
 _geocode_cache: dict[str, tuple[float, float, str]] = {}
 
 
+def error_status(message: str) -> Status:
+    """ERROR span status with the description capped at 200 chars."""
+    return Status(StatusCode.ERROR, message[:200])
+
+
 def setup_telemetry():
     resource = Resource.create({"service.name": "mcp-server", "service.version": "1.0.0"})
-    provider = TracerProvider(resource=resource)
+    # Head sampling: OTEL_TRACES_SAMPLER_ARG (0.0-1.0) sets the fraction of new
+    # traces kept; requests with a sampled parent follow the caller's decision
+    sampler = ParentBased(TraceIdRatioBased(float(os.getenv("OTEL_TRACES_SAMPLER_ARG", "1.0"))))
+    provider = TracerProvider(resource=resource, sampler=sampler)
     endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
-    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=endpoint, insecure=True)))
+    provider.add_span_processor(BatchSpanProcessor(
+        OTLPSpanExporter(endpoint=endpoint, insecure=True),
+        max_queue_size=int(os.getenv("OTEL_BSP_MAX_QUEUE_SIZE", "4096")),
+        schedule_delay_millis=int(os.getenv("OTEL_BSP_SCHEDULE_DELAY", "1000")),
+        max_export_batch_size=int(os.getenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "256")),
+        export_timeout_millis=int(os.getenv("OTEL_BSP_EXPORT_TIMEOUT", "10000")),
+    ))
     trace.set_tracer_provider(provider)
     return trace.get_tracer("mcp-server")
 
@@ -103,15 +129,29 @@ class ToolCallRequest(BaseModel):
 
 @inner_app.get("/health")
 async def health():
-    return {"status": "healthy", "protocol_version": MCP_PROTOCOL_VERSION, "tools": list(TOOLS.keys())}
+    return Response(
+        content=orjson.dumps({"status": "healthy", "protocol_version": MCP_PROTOCOL_VERSION, "tools": list(TOOLS.keys())}),
+        media_type="application/json",
+    )
 
 
-@inner_app.post("/mcp")
-async def handle_mcp(request: Request, body: ToolCallRequest):
+# The body is validated by hand, so its schema is documented explicitly
+@inner_app.post("/mcp", openapi_extra={
+    "requestBody": {"required": True, "content": {"application/json": {"schema": ToolCallRequest.model_json_schema()}}},
+})
+async def handle_mcp(request: Request):
     """Handle MCP JSON-RPC requests."""
+    # Parse + validate the raw body in one pass with pydantic-core; error locs
+    # get the "body" prefix FastAPI itself would report
+    try:
+        body = ToolCallRequest.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        ) from e
     ctx = extract(request.headers)
-    session_id = request.headers.get("mcp-session-id", uuid4().hex)
-    request_id = body.id or str(uuid4().hex[:8])
+    session_id = request.headers.get("mcp-session-id") or os.urandom(16).hex()
+    request_id = body.id or os.urandom(4).hex()
     tool_name = body.params.get("name", "unknown")
     arguments = body.params.get("arguments", {})
 
@@ -136,16 +176,23 @@ async def handle_mcp(request: Request, body: ToolCallRequest):
             attributes={
                 "gen_ai.operation.name": "execute_tool",
                 "gen_ai.tool.name": tool_name,
-                "gen_ai.tool.call.id": f"call_{uuid4().hex[:8]}",
+                "gen_ai.tool.call.id": f"call_{os.urandom(4).hex()}",
             },
         ) as tool_span:
             try:
                 result = await execute_tool(tool_name, arguments, tool_span)
-                return {"jsonrpc": "2.0", "id": request_id, "result": result}
+                return Response(
+                    content=orjson.dumps({"jsonrpc": "2.0", "id": request_id, "result": result}),
+                    media_type="application/json",
+                )
             except Exception as e:
-                tool_span.set_status(Status(StatusCode.ERROR, str(e)))
-                mcp_span.set_status(Status(StatusCode.ERROR, str(e)))
-                return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32000, "message": str(e)}}
+                status = error_status(str(e))
+                tool_span.set_status(status)
+                mcp_span.set_status(status)
+                return Response(
+                    content=orjson.dumps({"jsonrpc": "2.0", "id": request_id, "error": {"code": -32000, "message": str(e)}}),
+                    media_type="application/json",
+                )
 
 
 async def geocode_city(city: str) -> tuple[float, float, str]:
@@ -336,12 +383,12 @@ def _fallback_weather(location: str) -> dict:
 
 def _fallback_attractions(destination: str) -> dict:
     """Fallback mock attractions when Wikipedia is unreachable."""
-    events = [
-        {"name": f"{destination} City Tour", "type": "tour", "venue": destination},
-        {"name": f"{destination} Food Festival", "type": "food", "venue": destination},
-        {"name": f"Live Music in {destination}", "type": "music", "venue": destination},
-    ]
-    return {"destination": destination, "events": random.sample(events, k=random.randint(1, 3)), "source": "fallback"}
+    order = random.choice(FALLBACK_EVENT_ORDERS)[:random.randint(1, len(FALLBACK_EVENT_TEMPLATES))]
+    events = []
+    for i in order:
+        name, event_type = FALLBACK_EVENT_TEMPLATES[i]
+        events.append({"name": name.format(dst=destination), "type": event_type, "venue": destination})
+    return {"destination": destination, "events": events, "source": "fallback"}
 
 
 def _fallback_currency(amount: float, from_currency: str, to_currency: str) -> dict:
@@ -407,8 +454,10 @@ async def execute_tool(name: str, args: dict, span) -> dict:
         raise ValueError(f"Unknown tool: {name}")
 
 
-app = OpenTelemetryMiddleware(inner_app)
+# Server spans for every route except health probes
+FastAPIInstrumentor.instrument_app(inner_app, excluded_urls="health")
+app = inner_app
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8003)
+    uvicorn.run(app, host="0.0.0.0", port=8003, loop="uvloop", http="httptools", log_level="warning")
@@ -14,22 +14,26 @@ import os
 import random
 import threading
 import time
+from contextlib import asynccontextmanager
 from typing import Optional
 from uuid import uuid4
 
 import httpx
+import orjson
 import requests
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
 from opentelemetry import trace, metrics
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
 from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.trace import SpanKind, Status, StatusCode
-from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
 from opentelemetry.propagate import inject
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
 from opensearch_genai_observability_sdk_py import Op, enrich, observe, register
 from bedrock_client import (
@@ -41,6 +45,9 @@ from bedrock_client import (
 AGENT_ID = "travel-planner-001"
 AGENT_NAME = "Travel Planner"
 
+# Fixed gen_ai attributes promoted to the root HTTP span on every request
+ROOT_SPAN_ATTRIBUTES = {"gen_ai.agent.name": AGENT_NAME, "gen_ai.operation.name": "invoke_agent"}
+
 WEATHER_AGENT_URL = os.getenv("WEATHER_AGENT_URL", "http://weather-agent:8000")
 EVENTS_AGENT_URL = os.getenv("EVENTS_AGENT_URL", "http://events-agent:8002")
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://mcp-server:8003")
@@ -116,22 +123,19 @@ TOOL_DEFINITIONS = [
         }
     }
 ]
-
-MODELS = [
-    "claude-opus-4.5", "claude-sonnet-4.5", "claude-haiku-4.5", "claude-sonnet-4", "claude-haiku",
-    "gpt-5", "gpt-4.1", "gpt-4.1-mini", "gpt-4o", "gpt-4o-mini", "o4-mini",
-    "gemini-3-flash", "gemini-2.5-pro", "gemini-2.5-flash",
-    "nova-2-pro", "nova-2-lite", "nova-premier", "nova-pro", "nova-lite",
-]
-SYSTEMS = {
-    "claude-opus-4.5": "anthropic", "claude-sonnet-4.5": "anthropic", "claude-haiku-4.5": "anthropic",
-    "claude-sonnet-4": "anthropic", "claude-haiku": "anthropic",
-    "gpt-5": "openai", "gpt-4.1": "openai", "gpt-4.1-mini": "openai",
-    "gpt-4o": "openai", "gpt-4o-mini": "openai", "o4-mini": "openai",
-    "gemini-3-flash": "google", "gemini-2.5-pro": "google", "gemini-2.5-flash": "google",
-    "nova-2-pro": "amazon", "nova-2-lite": "amazon", "nova-premier": "amazon",
-    "nova-pro": "amazon", "nova-lite": "amazon",
-}
+# Serialized once for the gen_ai.tool.definitions span attribute
+TOOL_DEFINITIONS_JSON = json.dumps(TOOL_DEFINITIONS)
+
+# Model rotation for realistic traces, paired with each model's provider
+MODEL_PROVIDERS = (
+    ("claude-opus-4.5", "anthropic"), ("claude-sonnet-4.5", "anthropic"), ("claude-haiku-4.5", "anthropic"),
+    ("claude-sonnet-4", "anthropic"), ("claude-haiku", "anthropic"),
+    ("gpt-5", "openai"), ("gpt-4.1", "openai"), ("gpt-4.1-mini", "openai"),
+    ("gpt-4o", "openai"), ("gpt-4o-mini", "openai"), ("o4-mini", "openai"),
+    ("gemini-3-flash", "google"), ("gemini-2.5-pro", "google"), ("gemini-2.5-flash", "google"),
+    ("nova-2-pro", "amazon"), ("nova-2-lite", "amazon"), ("nova-premier", "amazon"),
+    ("nova-pro", "amazon"), ("nova-lite", "amazon"),
+)
 
 DESTINATION_CURRENCIES = {
     "paris": "EUR", "london": "GBP", "tokyo": "JPY", "berlin": "EUR",
@@ -142,6 +146,14 @@ DESTINATION_CURRENCIES = {
 
 MCP_PROTOCOL_VERSION = "2025-06-18"
 
+# Error text kept per failure in span status and attributes; responses carry errors unchanged
+MAX_ERROR_CHARS = 200
+
+
+def error_status(message: str) -> Status:
+    """ERROR span status with the description capped at 200 chars."""
+    return Status(StatusCode.ERROR, message[:MAX_ERROR_CHARS])
+
 
 class SubAgentFault(BaseModel):
     type: str = Field(..., description="Fault type: timeout, error, rate_limited, high_latency, wrong_city, empty")
@@ -162,6 +174,27 @@ class PlanRequest(BaseModel):
     fault: Optional[FaultConfig] = None
 
 
+def request_body_openapi(model: type[BaseModel]) -> dict:
+    """openapi_extra documenting a JSON body that the handler validates itself.
+
+    The model's $defs are inlined since they are not registered as OpenAPI components.
+    """
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def inline(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                siblings = {key: inline(value) for key, value in node.items() if key != "$ref"}
+                return {**inline(defs[node["$ref"].rsplit("/", 1)[-1]]), **siblings}
+            return {key: inline(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [inline(value) for value in node]
+        return node
+
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": inline(schema)}}}}
+
+
 class PlanResponse(BaseModel):
     destination: str
     weather: Optional[dict] = None
@@ -176,6 +209,23 @@ class PlanResponse(BaseModel):
 # --- Telemetry setup ---
 otlp_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
 
+# Head sampling: set OTEL_TRACES_SAMPLER_ARG (e.g. 0.1) to keep only that
+# fraction of traces. register() creates a default TracerProvider, which picks
+# its sampler from the standard OTEL_TRACES_SAMPLER/_ARG environment variables.
+if os.getenv("OTEL_TRACES_SAMPLER_ARG"):
+    os.environ.setdefault("OTEL_TRACES_SAMPLER", "parentbased_traceidratio")
+
+# register() builds its BatchSpanProcessor with defaults, which the OTel SDK
+# reads from the OTEL_BSP_* environment variables: a bigger queue, smaller
+# batches and a shorter delay keep export off the /plan critical path.
+for _key, _value in (
+    ("OTEL_BSP_MAX_QUEUE_SIZE", "4096"),
+    ("OTEL_BSP_SCHEDULE_DELAY", "1000"),
+    ("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "256"),
+    ("OTEL_BSP_EXPORT_TIMEOUT", "10000"),
+):
+    os.environ.setdefault(_key, _value)
+
 register(
     endpoint=f"grpc://{otlp_endpoint.replace('http://', '').replace('https://', '')}",
     service_name="travel-planner",
@@ -192,12 +242,29 @@ metrics.set_meter_provider(meter_provider)
 
 HTTPXClientInstrumentor().instrument()
 
-inner_app = FastAPI(title="Travel Planner", version="1.0.0")
+# Shared connection pool for sub-agent and MCP calls (created after
+# instrumentation so its transport is traced). Timeouts are set per call.
+http_client = httpx.AsyncClient(
+    timeout=30.0,
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=30.0),
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await http_client.aclose()
+
+
+inner_app = FastAPI(title="Travel Planner", version="1.0.0", lifespan=lifespan)
 
 
 @inner_app.get("/health")
 async def health():
-    return {"status": "healthy", "agent_id": AGENT_ID, "agent_name": AGENT_NAME}
+    return Response(
+        content=orjson.dumps({"status": "healthy", "agent_id": AGENT_ID, "agent_name": AGENT_NAME}),
+        media_type="application/json",
+    )
 
 
 async def call_mcp_tool(tool_name: str, arguments: dict) -> dict:
@@ -206,11 +273,13 @@ async def call_mcp_tool(tool_name: str, arguments: dict) -> dict:
     request_id = uuid4().hex[:8]
 
     with observe(f"tools/call {tool_name}", op=Op.EXECUTE_TOOL, kind=SpanKind.CLIENT) as span:
-        span.set_attribute("mcp.method.name", "tools/call")
-        span.set_attribute("mcp.session.id", session_id)
-        span.set_attribute("mcp.protocol.version", MCP_PROTOCOL_VERSION)
-        span.set_attribute("jsonrpc.request.id", request_id)
-        span.set_attribute("gen_ai.tool.name", tool_name)
+        span.set_attributes({
+            "mcp.method.name": "tools/call",
+            "mcp.session.id": session_id,
+            "mcp.protocol.version": MCP_PROTOCOL_VERSION,
+            "jsonrpc.request.id": request_id,
+            "gen_ai.tool.name": tool_name,
+        })
 
         enrich(
             input_messages=[{"role": "tool_call", "parts": [{"type": "text", "content": json.dumps(arguments)}]}],
@@ -222,22 +291,79 @@ async def call_mcp_tool(tool_name: str, arguments: dict) -> dict:
             "jsonrpc": "2.0", "method": "tools/call", "id": request_id,
             "params": {"name": tool_name, "arguments": arguments}
         }
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            resp = await client.post(f"{MCP_SERVER_URL}/mcp", json=payload, headers=headers)
-            result = resp.json()
-            if "error" in result:
-                raise Exception(result["error"].get("message", "MCP tool call failed"))
-            tool_result = result.get("result", {})
-            enrich(
-                output_messages=[{"role": "tool_result", "parts": [{"type": "text", "content": json.dumps(tool_result)}]}],
-            )
-            return tool_result
-
-
-@inner_app.post("/plan")
-async def plan_trip(request: PlanRequest):
-    model = random.choice(MODELS)
-    provider = SYSTEMS[model]
+        resp = await http_client.post(f"{MCP_SERVER_URL}/mcp", json=payload, headers=headers, timeout=15.0)
+        result = resp.json()
+        if "error" in result:
+            raise Exception(result["error"].get("message", "MCP tool call failed"))
+        tool_result = result.get("result", {})
+        enrich(
+            output_messages=[{"role": "tool_result", "parts": [{"type": "text", "content": json.dumps(tool_result)}]}],
+        )
+        return tool_result
+
+
+async def invoke_weather_agent(payload: dict, timeout: float, partial_failure: bool) -> tuple[Optional[dict], Optional[dict]]:
+    """Call the weather agent. Returns (weather_data, error)."""
+    with observe("weather-agent", op=Op.INVOKE_AGENT, kind=SpanKind.CLIENT) as agent_span:
+        agent_span.set_attribute("gen_ai.agent.name", "weather-agent")
+        try:
+            if partial_failure and random.random() < 0.5:
+                raise Exception("Simulated partial failure - skipping weather")
+            resp = await http_client.post(f"{WEATHER_AGENT_URL}/invoke", json=payload, timeout=timeout)
+            if resp.status_code == 200:
+                return resp.json(), None
+            agent_span.set_status(error_status(resp.text))
+            return None, {"agent": "weather", "error": resp.text}
+        except Exception as e:
+            agent_span.set_status(error_status(str(e)))
+            return None, {"agent": "weather", "error": str(e)}
+
+
+async def invoke_events_agent(payload: dict, timeout: float, partial_failure: bool) -> tuple[list, Optional[dict]]:
+    """Call the events agent. Returns (events, error)."""
+    with observe("events-agent", op=Op.INVOKE_AGENT, kind=SpanKind.CLIENT) as agent_span:
+        agent_span.set_attribute("gen_ai.agent.name", "events-agent")
+        try:
+            if partial_failure and random.random() < 0.5:
+                raise Exception("Simulated partial failure - skipping events")
+            resp = await http_client.post(f"{EVENTS_AGENT_URL}/events", json=payload, timeout=timeout)
+            if resp.status_code != 200:
+                agent_span.set_status(error_status(resp.text))
+                return [], {"agent": "events", "error": resp.text}
+            data = resp.json()
+            if "error" in data:
+                agent_span.set_status(error_status(str(data["error"])))
+                return [], {"agent": "events", "error": data["error"]}
+            return data.get("events", []), None
+        except Exception as e:
+            agent_span.set_status(error_status(str(e)))
+            return [], {"agent": "events", "error": str(e)}
+
+
+async def synthetic_chat(name: str, model: str, provider: str, input_tokens: tuple[int, int],
+                         output_tokens: tuple[int, int], finish_reason: str, delay: tuple[float, float]) -> None:
+    """Record a simulated "chat" span with random token usage and latency.
+
+    Awaited in place so the span sits before or after the sub-agent calls it
+    models and ends inside the caller's invoke_agent span.
+    """
+    with observe(name, op=Op.CHAT):
+        enrich(model=model, provider=provider, input_tokens=random.randint(*input_tokens), output_tokens=random.randint(*output_tokens), finish_reason=finish_reason)
+        await asyncio.sleep(random.uniform(*delay))
+
+
+@inner_app.post("/plan", openapi_extra=request_body_openapi(PlanRequest))
+async def plan_trip(http_request: Request):
+    # Parse + validate the raw body in one pass with pydantic-core; error locs
+    # get the "body" prefix FastAPI itself would report
+    try:
+        request = PlanRequest.model_validate_json(await http_request.body())
+    except ValidationError as e:
+        raise RequestValidationError(
+            [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+        ) from e
+
+    model, provider = random.choice(MODEL_PROVIDERS)
 
     enrich(
         model=model,
@@ -246,28 +372,28 @@ async def plan_trip(request: PlanRequest):
         input_messages=[{"role": "user", "parts": [{"type": "text", "content": f"Plan a trip to {request.destination}"}]}],
     )
     root_span = trace.get_current_span()
-    root_span.set_attribute("gen_ai.agent.name", AGENT_NAME)
-    root_span.set_attribute("gen_ai.operation.name", "invoke_agent")
+    root_span.set_attributes(ROOT_SPAN_ATTRIBUTES)
 
     with observe(AGENT_NAME, op=Op.INVOKE_AGENT) as span:
         enrich(
             model=model,
             provider=provider,
             agent_id=AGENT_ID,
-            tool_definitions=TOOL_DEFINITIONS,
             destination=request.destination,
         )
+        span.set_attribute("gen_ai.tool.definitions", TOOL_DEFINITIONS_JSON)
 
         fault = request.fault
+        orchestrator_fault = fault.orchestrator if fault else None
+        weather_fault = fault.weather if fault else None
+        events_fault = fault.events if fault else None
         errors = []
-        weather_data = None
-        events_data = []
         flights_data = None
         currency_data = None
 
         # LLM planning call
-        with observe("planning", op=Op.CHAT) as planning_span:
-            if _config_cache["use_real_llm"] and _bedrock_client:
+        if _config_cache["use_real_llm"] and _bedrock_client:
+            with observe("planning", op=Op.CHAT) as planning_span:
                 try:
                     planning_messages = [{"role": "user", "content": [{"text": f"Plan a weekend trip to {request.destination}. What information should we gather about weather, attractions, flights, and currency?"}]}]
                     planning_response = converse(
@@ -288,64 +414,33 @@ async def plan_trip(request: PlanRequest):
                     planning_span.set_attribute("gen_ai.bedrock.fallback", True)
                     planning_span.set_attribute("gen_ai.bedrock.fallback.reason", str(e)[:200])
                     enrich(model=model, provider=provider, input_tokens=random.randint(500, 2000), output_tokens=random.randint(100, 500), finish_reason="tool_calls")
-                    time.sleep(random.uniform(0.1, 0.3))
-            else:
-                enrich(model=model, provider=provider, input_tokens=random.randint(500, 2000), output_tokens=random.randint(100, 500), finish_reason="tool_calls")
-                time.sleep(random.uniform(0.1, 0.3))
+                    await asyncio.sleep(random.uniform(0.1, 0.3))
+        else:
+            await synthetic_chat("planning", model, provider, (500, 2000), (100, 500), "tool_calls", (0.1, 0.3))
 
         # Build sub-agent payloads with fault pass-through
         weather_payload = {"message": f"What's the weather in {request.destination}?"}
         events_payload = {"destination": request.destination}
 
-        if fault:
-            if fault.weather:
-                weather_payload["fault"] = fault.weather.model_dump()
-            if fault.events:
-                events_payload["fault"] = fault.events.model_dump()
+        if weather_fault:
+            weather_payload["fault"] = weather_fault.model_dump(exclude_none=True)
+        if events_fault:
+            events_payload["fault"] = events_fault.model_dump(exclude_none=True)
 
         # Orchestrator-level fault injection
-        if fault and fault.orchestrator:
-            span.set_attribute("fault.orchestrator", fault.orchestrator)
-            timeout = 0.001 if fault.orchestrator == "fan_out_timeout" else 30.0
-        else:
-            timeout = 30.0
+        timeout = 30.0
+        if orchestrator_fault:
+            span.set_attribute("fault.orchestrator", orchestrator_fault)
+            if orchestrator_fault == "fan_out_timeout":
+                timeout = 0.001
 
         # Fan out to sub-agents (weather + events in parallel)
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            with observe("weather-agent", op=Op.INVOKE_AGENT, kind=SpanKind.CLIENT) as agent_span:
-                agent_span.set_attribute("gen_ai.agent.name", "weather-agent")
-                try:
-                    if fault and fault.orchestrator == "partial_failure" and random.random() < 0.5:
-                        raise Exception("Simulated partial failure - skipping weather")
-                    resp = await client.post(f"{WEATHER_AGENT_URL}/invoke", json=weather_payload)
-                    if resp.status_code == 200:
-                        weather_data = resp.json()
-                    else:
-                        errors.append({"agent": "weather", "error": resp.text})
-                        agent_span.set_status(Status(StatusCode.ERROR, resp.text))
-                except Exception as e:
-                    errors.append({"agent": "weather", "error": str(e)})
-                    agent_span.set_status(Status(StatusCode.ERROR, str(e)))
-
-            with observe("events-agent", op=Op.INVOKE_AGENT, kind=SpanKind.CLIENT) as agent_span:
-                agent_span.set_attribute("gen_ai.agent.name", "events-agent")
-                try:
-                    if fault and fault.orchestrator == "partial_failure" and random.random() < 0.5:
-                        raise Exception("Simulated partial failure - skipping events")
-                    resp = await client.post(f"{EVENTS_AGENT_URL}/events", json=events_payload)
-                    if resp.status_code == 200:
-                        data = resp.json()
-                        if "error" not in data:
-                            events_data = data.get("events", [])
-                        else:
-                            errors.append({"agent": "events", "error": data["error"]})
-                            agent_span.set_status(Status(StatusCode.ERROR, str(data["error"])))
-                    else:
-                        errors.append({"agent": "events", "error": resp.text})
-                        agent_span.set_status(Status(StatusCode.ERROR, resp.text))
-                except Exception as e:
-                    errors.append({"agent": "events", "error": str(e)})
-                    agent_span.set_status(Status(StatusCode.ERROR, str(e)))
+        partial_failure = orchestrator_fault == "partial_failure"
+        (weather_data, weather_error), (events_data, events_error) = await asyncio.gather(
+            invoke_weather_agent(weather_payload, timeout, partial_failure),
+            invoke_events_agent(events_payload, timeout, partial_failure),
+        )
+        errors.extend(err for err in (weather_error, events_error) if err)
 
         # Sequential MCP calls for flights and currency (produces deeper trace waterfall)
         origin = request.origin or "Portland"
@@ -370,11 +465,13 @@ async def plan_trip(request: PlanRequest):
                 errors.append({"agent": "currency", "error": str(e)})
 
         # Final response "chat" span — summarize gathered data
-        with observe("summarize", op=Op.CHAT) as summarize_span:
-            gathered = {"destination": request.destination, "weather": weather_data, "events": events_data, "flights": flights_data, "currency": currency_data}
-            if _config_cache["use_real_llm"] and _bedrock_client:
+        recommendation = None
+        if _config_cache["use_real_llm"] and _bedrock_client:
+            with observe("summarize", op=Op.CHAT) as summarize_span:
+                gathered = {"destination": request.destination, "weather": weather_data, "events": events_data, "flights": flights_data, "currency": currency_data}
                 try:
-                    summary_messages = [{"role": "user", "content": [{"text": f"Summarize this trip data into a brief recommendation (2-3 sentences):\n{json.dumps(gathered, default=str)}"}]}]
+                    gathered_json = json.dumps(gathered, default=str)
+                    summary_messages = [{"role": "user", "content": [{"text": f"Summarize this trip data into a brief recommendation (2-3 sentences):\n{gathered_json}"}]}]
                     summary_response = converse(
                         _bedrock_client, summary_messages,
                         system="You are a travel assistant. Give a concise, enthusiastic trip recommendation based on the gathered data.",
@@ -387,27 +484,24 @@ async def plan_trip(request: PlanRequest):
                         input_tokens=usage["input_tokens"],
                         output_tokens=usage["output_tokens"],
                         finish_reason=summary_response.get("stopReason", "end_turn"),
-                        input_messages=[{"role": "user", "parts": [{"type": "text", "content": json.dumps(gathered, default=str)}]}],
+                        input_messages=[{"role": "user", "parts": [{"type": "text", "content": gathered_json}]}],
                         output_messages=[{"role": "assistant", "parts": [{"type": "text", "content": recommendation}]}],
                     )
                 except BedrockUnavailableError as e:
                     summarize_span.set_attribute("gen_ai.bedrock.fallback", True)
                     summarize_span.set_attribute("gen_ai.bedrock.fallback.reason", str(e)[:200])
-                    recommendation = None
                     enrich(model=model, provider=provider, input_tokens=random.randint(200, 800), output_tokens=random.randint(50, 200), finish_reason="stop")
-                    time.sleep(random.uniform(0.05, 0.15))
-            else:
-                recommendation = None
-                enrich(model=model, provider=provider, input_tokens=random.randint(200, 800), output_tokens=random.randint(50, 200), finish_reason="stop")
-                time.sleep(random.uniform(0.05, 0.15))
+                    await asyncio.sleep(random.uniform(0.05, 0.15))
+        else:
+            await synthetic_chat("summarize", model, provider, (200, 800), (50, 200), "stop", (0.05, 0.15))
 
         partial = len(errors) > 0
         if partial:
-            span.set_attribute("response.partial", True)
-            span.set_attribute("response.errors_count", len(errors))
+            error_attrs = {"response.partial": True, "response.errors_count": len(errors)}
             for i, err in enumerate(errors):
-                span.set_attribute(f"response.error_{i}_agent", err["agent"])
-                span.set_attribute(f"response.error_{i}_message", str(err["error"])[:200])
+                error_attrs[f"response.error_{i}_agent"] = err["agent"]
+                error_attrs[f"response.error_{i}_message"] = str(err["error"])[:MAX_ERROR_CHARS]
+            span.set_attributes(error_attrs)
             span.set_status(Status(StatusCode.ERROR, f"Partial failure: {len(errors)} sub-agent(s) failed"))
 
         if not recommendation:
@@ -417,15 +511,19 @@ async def plan_trip(request: PlanRequest):
         output_messages=[{"role": "assistant", "parts": [{"type": "text", "content": recommendation}]}],
     )
 
-    return PlanResponse(
-        destination=request.destination,
-        weather=weather_data,
-        events=events_data,
-        flights=flights_data,
-        currency=currency_data,
-        recommendation=recommendation,
-        partial=partial,
-        errors=errors,
+    # Returned as a Response so FastAPI doesn't re-encode/validate the model
+    return Response(
+        content=PlanResponse(
+            destination=request.destination,
+            weather=weather_data,
+            events=events_data,
+            flights=flights_data,
+            currency=currency_data,
+            recommendation=recommendation,
+            partial=partial,
+            errors=errors,
+        ).model_dump_json(),
+        media_type="application/json",
     )
 
 
@@ -457,8 +555,10 @@ def build_recommendation(destination: str, weather: Optional[dict], events: list
     return " ".join(parts)
 
 
-app = OpenTelemetryMiddleware(inner_app)
+# Server spans for every route except health probes
+FastAPIInstrumentor.instrument_app(inner_app, excluded_urls="health")
+app = inner_app
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools", log_level="warning")
@@ -14,17 +14,19 @@ Key features demonstrated:
 - Structured logging with trace correlation
 """
 
+import asyncio
 from dataclasses import dataclass
-import json
 import logging
 import os
 import random
 import threading
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Literal, Optional
 from uuid import uuid4
 
+import grpc
 import httpx
+import orjson
 import requests as req_lib
 from opentelemetry import trace, metrics
 from opentelemetry.trace import SpanKind, Status, StatusCode
@@ -33,7 +35,8 @@ from opentelemetry.sdk.metrics import MeterProvider
 from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
-from opentelemetry._logs import set_logger_provider
+from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+from opentelemetry._logs import get_logger_provider, set_logger_provider
 from opentelemetry.sdk._logs import LoggerProvider, LoggingHandler
 from opentelemetry.sdk._logs.export import BatchLogRecordProcessor
 from opentelemetry.exporter.otlp.proto.grpc._log_exporter import OTLPLogExporter
@@ -45,9 +48,17 @@ from bedrock_client import (
 )
 
 FAULT_PANEL_URL = os.getenv("FAULT_PANEL_URL", "http://fault-panel:8085")
+# Scales the simulated LLM/tool latency; 0 disables it so load tests measure
+# the instrumentation overhead rather than the sleeps
+SIM_LATENCY = float(os.getenv("WEATHER_AGENT_SIM_LATENCY", "1.0"))
 _config_cache = {"use_real_llm": False}
 
 
+def _dumps(obj: Any) -> str:
+    """Serialize to a JSON string for span attributes (orjson emits bytes)."""
+    return orjson.dumps(obj).decode()
+
+
 def _poll_config():
     while True:
         try:
@@ -88,7 +99,7 @@ class RateLimitError(AgentError):
         super().__init__(message, "rate_limit_exceeded", 429)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FaultConfig:
     """Configuration for fault injection."""
     type: str
@@ -115,20 +126,122 @@ SYSTEMS = {
 }
 
 
+# Keep the exporters' gRPC connection warm between batches instead of letting
+# it idle out and paying connection setup again on the next export
+OTLP_GRPC_CHANNEL_OPTIONS = (
+    ("grpc.keepalive_time_ms", 30000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.http2.max_pings_without_data", 0),
+)
+
+# OTel providers are process-global; setup_telemetry records its arguments and
+# result here so repeat calls reuse them instead of stacking exporters
+_telemetry_setup: Dict[str, Any] = {}
+
+
 def setup_telemetry(
     service_name: str = "weather-agent",
     service_version: str = "1.0.0",
-    otlp_endpoint: str = "http://localhost:4317"
+    otlp_endpoint: str = "http://localhost:4317",
+    otlp_protocol: Literal["grpc", "http"] = "grpc",
+    span_max_queue_size: int = 4096,
+    span_schedule_delay_millis: int = 1000,
+    span_max_export_batch_size: int = 128,
+    span_export_timeout_millis: int = 10000,
+    log_batch_max_queue_size: int = 4096,
+    log_batch_schedule_delay_millis: int = 1000,
+    log_batch_max_export_batch_size: int = 128,
+    log_batch_export_timeout_millis: int = 10000,
+    metric_export_interval_millis: Optional[int] = None,
+    metric_max_export_batch_size: int = 512,
+    demo_mode: bool = False,
 ) -> tuple:
     """
     Set up telemetry using the SDK for tracing, plus manual setup for metrics and logs.
 
     The SDK's register() replaces ~30 lines of TracerProvider/exporter config.
     Metrics and logs still use manual OTel setup (SDK handles tracing only).
+
+    The span_* arguments tune the BatchSpanProcessor created by register();
+    OTEL_BSP_* environment variables, when set, take precedence.
+    The log_batch_* arguments tune the BatchLogRecordProcessor the same way.
+    metric_export_interval_millis defaults to OTEL_METRIC_EXPORT_INTERVAL, else
+    60s; demo_mode exports every 2s so short-lived runs show data quickly.
+    metric_max_export_batch_size caps the data points per metric export request.
+    otlp_protocol="http" exports OTLP/HTTP protobuf to otlp_endpoint (usually
+    port 4318) instead of gRPC. Over gRPC, otlp_endpoint may also be a
+    unix:///path socket for a collector on the same host.
+    OTEL_LOGS_EXPORTER=none sends agent logs to stdout instead of through OTLP.
+
+    With OTEL_SDK_DISABLED=true nothing is set up: the agent gets the API's
+    no-op tracer and meter, so spans are non-recording and enrich()/attribute
+    work is skipped.
+
+    Telemetry is configured once per process. Calling again with the same
+    arguments returns the original (meter, logger); different arguments raise
+    RuntimeError.
     """
+    settings = dict(locals())
+    if _telemetry_setup:
+        if settings != _telemetry_setup["settings"]:
+            raise RuntimeError("setup_telemetry() was already called with different arguments")
+        return _telemetry_setup["result"]
+
+    if os.getenv("OTEL_SDK_DISABLED", "false").lower() == "true":
+        logging.getLogger().setLevel(logging.INFO)
+        _telemetry_setup.update(settings=settings, result=(metrics.get_meter(__name__), logging.getLogger(__name__)))
+        return _telemetry_setup["result"]
+
+    # register() builds its BatchSpanProcessor with defaults, which the OTel SDK
+    # reads from OTEL_BSP_*: small batches stay well under gRPC's 4MB message
+    # limit and a 1s delay gets agent traces to the backend quickly.
+    for key, value in (
+        ("OTEL_BSP_MAX_QUEUE_SIZE", span_max_queue_size),
+        ("OTEL_BSP_SCHEDULE_DELAY", span_schedule_delay_millis),
+        ("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", span_max_export_batch_size),
+        ("OTEL_BSP_EXPORT_TIMEOUT", span_export_timeout_millis),
+    ):
+        os.environ.setdefault(key, str(value))
+
+    # Head sampling: with OTEL_TRACES_SAMPLER_ARG set (e.g. 0.1) only that
+    # fraction of traces is recorded. register()'s TracerProvider reads its
+    # sampler from the standard OTEL_TRACES_SAMPLER/_ARG variables.
+    if os.getenv("OTEL_TRACES_SAMPLER_ARG"):
+        os.environ.setdefault("OTEL_TRACES_SAMPLER", "parentbased_traceidratio")
+
+    export_logs = os.getenv("OTEL_LOGS_EXPORTER", "otlp").lower() != "none"
+    if otlp_protocol == "http":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter as HTTPSpanExporter
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter as HTTPMetricExporter
+        from opentelemetry.exporter.otlp.proto.http._log_exporter import OTLPLogExporter as HTTPLogExporter
+        from opentelemetry.exporter.otlp.proto.http import Compression as HTTPCompression
+
+        base_url = otlp_endpoint.rstrip("/")
+        otlp_span_exporter = HTTPSpanExporter(endpoint=f"{base_url}/v1/traces", compression=HTTPCompression.Gzip)
+        otlp_metric_exporter = HTTPMetricExporter(
+            endpoint=f"{base_url}/v1/metrics",
+            compression=HTTPCompression.Gzip,
+            max_export_batch_size=metric_max_export_batch_size,
+        )
+        otlp_log_exporter = HTTPLogExporter(endpoint=f"{base_url}/v1/logs", compression=HTTPCompression.Gzip) if export_logs else None
+    else:
+        # The exporters can't take a prebuilt channel, but gRPC pools
+        # subchannels globally: channels with the same target and options
+        # share one HTTP/2 connection. Keep the arguments identical so all
+        # three signals multiplex over a single connection to the collector.
+        grpc_exporter_kwargs = {
+            "endpoint": otlp_endpoint,
+            "insecure": True,
+            "compression": grpc.Compression.Gzip,
+            "channel_options": OTLP_GRPC_CHANNEL_OPTIONS,
+        }
+        otlp_span_exporter = OTLPSpanExporter(**grpc_exporter_kwargs)
+        otlp_metric_exporter = OTLPMetricExporter(**grpc_exporter_kwargs, max_export_batch_size=metric_max_export_batch_size)
+        otlp_log_exporter = OTLPLogExporter(**grpc_exporter_kwargs) if export_logs else None
+
     # Tracing — one line via SDK
     register(
-        endpoint=f"grpc://{otlp_endpoint.replace('http://', '').replace('https://', '')}",
+        exporter=otlp_span_exporter,
         service_name=service_name,
         service_version=service_version,
     )
@@ -140,24 +253,45 @@ def setup_telemetry(
         "service.version": service_version,
         "deployment.environment": "development"
     })
-    otlp_metric_exporter = OTLPMetricExporter(endpoint=otlp_endpoint, insecure=True)
-    metric_reader = PeriodicExportingMetricReader(otlp_metric_exporter, export_interval_millis=2000)
+    if demo_mode:
+        metric_export_interval_millis = 2000
+    elif metric_export_interval_millis is None:
+        metric_export_interval_millis = int(os.getenv("OTEL_METRIC_EXPORT_INTERVAL", "60000"))
+    metric_reader = PeriodicExportingMetricReader(
+        otlp_metric_exporter,
+        export_interval_millis=metric_export_interval_millis,
+        export_timeout_millis=min(30000, metric_export_interval_millis // 2),
+    )
     meter_provider = MeterProvider(resource=resource, metric_readers=[metric_reader])
     metrics.set_meter_provider(meter_provider)
     meter = metrics.get_meter(__name__)
 
     # Logging — manual setup
-    logger_provider = LoggerProvider(resource=resource)
-    otlp_log_exporter = OTLPLogExporter(endpoint=otlp_endpoint, insecure=True)
-    logger_provider.add_log_record_processor(BatchLogRecordProcessor(otlp_log_exporter))
-    set_logger_provider(logger_provider)
-
-    handler = LoggingHandler(level=logging.INFO, logger_provider=logger_provider)
+    if otlp_log_exporter is None:
+        # OTEL_LOGS_EXPORTER=none: plain stdout for local development, no
+        # OTLP log pipeline at all
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    else:
+        logger_provider = LoggerProvider(resource=resource)
+        logger_provider.add_log_record_processor(BatchLogRecordProcessor(
+            otlp_log_exporter,
+            max_queue_size=log_batch_max_queue_size,
+            schedule_delay_millis=log_batch_schedule_delay_millis,
+            max_export_batch_size=log_batch_max_export_batch_size,
+            export_timeout_millis=log_batch_export_timeout_millis,
+        ))
+        set_logger_provider(logger_provider)
+        handler = LoggingHandler(level=logging.INFO, logger_provider=logger_provider)
+
+    # The handler sits on root so records from bedrock_client, httpx and the
+    # SDK are exported alongside the agent's own
     logging.getLogger().addHandler(handler)
     logging.getLogger().setLevel(logging.INFO)
 
     logger = logging.getLogger(__name__)
 
+    _telemetry_setup.update(settings=settings, result=(meter, logger))
     return meter, logger
 
 
@@ -165,11 +299,41 @@ def setup_telemetry(
 MCP_SERVER_URL = os.getenv("MCP_SERVER_URL", "http://mcp-server:8003")
 MCP_PROTOCOL_VERSION = "2025-06-18"
 
+# GenAI content capture (prompts, messages, tool arguments/results) is opt-in
+# per the OTel GenAI conventions; this demo leaves it on unless disabled
+CAPTURE_MESSAGE_CONTENT = os.getenv("OTEL_INSTRUMENTATION_GENAI_CAPTURE_MESSAGE_CONTENT", "true").lower() == "true"
+
+SYSTEM_INSTRUCTIONS = [
+    {"type": "text", "content": "You are a helpful weather assistant."}
+]
+
+# Chat-format system message sent ahead of every user turn (treat as read-only)
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_INSTRUCTIONS[0]["content"]}
+
+MCP_CLIENT_SPAN_ATTRIBUTES = {
+    "mcp.method.name": "tools/call",
+    "mcp.protocol.version": MCP_PROTOCOL_VERSION,
+    "gen_ai.operation.name": "execute_tool",
+    "network.transport": "tcp",
+    "network.protocol.name": "http",
+}
+
+# Shared async client so concurrent tool calls reuse pooled connections
+_mcp_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(30.0, connect=5.0),
+    limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+)
+
+
+async def close_mcp_client() -> None:
+    """Close the shared MCP client's pooled connections."""
+    await _mcp_client.aclose()
+
 
 # Simulated weather tool
-def get_weather(location: str) -> Dict[str, Any]:
+async def get_weather(location: str) -> Dict[str, Any]:
     """Simulated weather API call."""
-    time.sleep(0.5)
+    await asyncio.sleep(0.5 * SIM_LATENCY)
     return {
         "location": location,
         "temperature": "57°F",
@@ -179,9 +343,9 @@ def get_weather(location: str) -> Dict[str, Any]:
     }
 
 
-def get_forecast(location: str, days: int = 3) -> Dict[str, Any]:
+async def get_forecast(location: str, days: int = 3) -> Dict[str, Any]:
     """Get weather forecast for a location."""
-    time.sleep(0.5)
+    await asyncio.sleep(0.5 * SIM_LATENCY)
     forecasts = []
     conditions = ["sunny", "cloudy", "rainy", "partly cloudy"]
     for i in range(days):
@@ -194,9 +358,9 @@ def get_forecast(location: str, days: int = 3) -> Dict[str, Any]:
     return {"location": location, "forecast": forecasts}
 
 
-def get_historical_weather(location: str, date: str) -> Dict[str, Any]:
+async def get_historical_weather(location: str, date: str) -> Dict[str, Any]:
     """Get historical weather for a location and date."""
-    time.sleep(0.5)
+    await asyncio.sleep(0.5 * SIM_LATENCY)
     return {
         "location": location,
         "date": date,
@@ -207,22 +371,59 @@ def get_historical_weather(location: str, date: str) -> Dict[str, Any]:
     }
 
 
+# Tools that run in-process rather than through the MCP server:
+# name -> (span name, coroutine factory taking the call arguments)
+LOCAL_TOOLS = {
+    "get_forecast": (
+        "local_tool get_forecast",
+        lambda args: get_forecast(args["location"], args.get("days", 3)),
+    ),
+    "get_historical_weather": (
+        "local_tool get_historical_weather",
+        lambda args: get_historical_weather(args["location"], args.get("date", "2026-01-01")),
+    ),
+}
+
+
+# Keywords that route a query to the forecast / historical tools
+FORECAST_WORDS = frozenset(["forecast", "next", "tomorrow", "week", "upcoming"])
+HISTORICAL_WORDS = frozenset(["yesterday", "last", "historical", "was", "were", "past"])
+
+
+# Model name reported by the simulated LLM
+MOCK_RESPONSE_MODEL = "gpt-4-0613"
+
+
+# Bedrock metric attributes don't depend on the agent instance; share one
+# dict per series so every add()/record() hits the same attribute set
+BEDROCK_TOKEN_ATTRS_INPUT = {"gen_ai.provider.name": "aws_bedrock", "gen_ai.request.model": BEDROCK_MODEL_ID, "gen_ai.token.type": "input"}
+BEDROCK_TOKEN_ATTRS_OUTPUT = {"gen_ai.provider.name": "aws_bedrock", "gen_ai.request.model": BEDROCK_MODEL_ID, "gen_ai.token.type": "output"}
+BEDROCK_DURATION_ATTRS = {
+    "gen_ai.operation.name": "invoke_agent",
+    "gen_ai.provider.name": "aws_bedrock",
+    "gen_ai.request.model": BEDROCK_MODEL_ID,
+    "gen_ai.response.model": BEDROCK_MODEL_ID,
+    "server.address": "bedrock-runtime.us-west-2.amazonaws.com",
+}
+
+
 # Simulated LLM call
-def call_llm(
+async def call_llm(
     model: str,
     messages: List[Dict[str, str]],
     tools: List[Dict[str, Any]]
 ) -> Dict[str, Any]:
     """Simulated LLM API call that selects appropriate tool based on query."""
-    time.sleep(1.0)
+    await asyncio.sleep(1.0 * SIM_LATENCY)
 
-    user_message = messages[-1]["content"].lower()
-    location = messages[-1]["content"].split()[-1].rstrip("?")
+    words = messages[-1]["content"].split()
+    location = words[-1].rstrip("?")
+    tokens = {word.strip("?.,!").lower() for word in words}
 
-    if any(word in user_message for word in ["forecast", "next", "tomorrow", "week", "upcoming"]):
+    if tokens & FORECAST_WORDS:
         tool_name = "get_forecast"
         arguments = {"location": location, "days": 3}
-    elif any(word in user_message for word in ["yesterday", "last", "historical", "was", "were", "past"]):
+    elif tokens & HISTORICAL_WORDS:
         tool_name = "get_historical_weather"
         arguments = {"location": location, "date": "2026-01-25"}
     else:
@@ -231,7 +432,7 @@ def call_llm(
 
     return {
         "id": "chatcmpl-123456",
-        "model": "gpt-4-0613",
+        "model": MOCK_RESPONSE_MODEL,
         "choices": [{
             "message": {
                 "role": "assistant",
@@ -240,7 +441,7 @@ def call_llm(
                     "type": "function",
                     "function": {
                         "name": tool_name,
-                        "arguments": json.dumps(arguments)
+                        "arguments": _dumps(arguments)
                     }
                 }]
             },
@@ -261,6 +462,62 @@ class WeatherAgent:
     Uses @observe decorator and enrich() instead of manual span creation and set_attribute() calls.
     """
 
+    __slots__ = (
+        "meter", "logger",
+        "agent_id", "agent_name", "agent_description", "model", "provider",
+        "token_counter", "operation_duration",
+        "_tools_json", "_system_instructions_json", "_tool_by_name", "_bedrock_tool_config",
+        "_static_invoke_attrs", "_token_attrs_input", "_token_attrs_output", "_op_duration_attrs",
+    )
+
+    # Available tools, shared by every instance
+    tools = (
+        {
+            "type": "function",
+            "function": {
+                "name": "get_current_weather",
+                "description": "Get current weather conditions for a location",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "location": {"type": "string", "description": "City name or location"}
+                    },
+                    "required": ["location"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "get_forecast",
+                "description": "Get weather forecast for the next several days",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "location": {"type": "string", "description": "City name or location"},
+                        "days": {"type": "integer", "description": "Number of days (1-7)", "default": 3}
+                    },
+                    "required": ["location"]
+                }
+            }
+        },
+        {
+            "type": "function",
+            "function": {
+                "name": "get_historical_weather",
+                "description": "Get historical weather data for a past date",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "location": {"type": "string", "description": "City name or location"},
+                        "date": {"type": "string", "description": "Date in YYYY-MM-DD format"}
+                    },
+                    "required": ["location", "date"]
+                }
+            }
+        }
+    )
+
     def __init__(self, meter, logger):
         self.meter = meter
         self.logger = logger
@@ -270,6 +527,7 @@ class WeatherAgent:
         self.agent_name = "Weather Assistant"
         self.agent_description = "Helps users get weather information for any location"
         self.model = random.choice(MODELS)
+        self.provider = SYSTEMS.get(self.model, "openai")
 
         # Create metrics
         self.token_counter = meter.create_counter(
@@ -284,146 +542,131 @@ class WeatherAgent:
             unit="s"
         )
 
-        # Available tools
-        self.tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_current_weather",
-                    "description": "Get current weather conditions for a location",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {"type": "string", "description": "City name or location"}
-                        },
-                        "required": ["location"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_forecast",
-                    "description": "Get weather forecast for the next several days",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {"type": "string", "description": "City name or location"},
-                            "days": {"type": "integer", "description": "Number of days (1-7)", "default": 3}
-                        },
-                        "required": ["location"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "get_historical_weather",
-                    "description": "Get historical weather data for a past date",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "location": {"type": "string", "description": "City name or location"},
-                            "date": {"type": "string", "description": "Date in YYYY-MM-DD format"}
-                        },
-                        "required": ["location", "date"]
-                    }
-                }
-            }
-        ]
+        # Tools and instructions never change per request; serialize them once
+        self._tools_json = _dumps(self.tools)
+        self._system_instructions_json = _dumps(SYSTEM_INSTRUCTIONS)
+        self._tool_by_name = {t["function"]["name"]: t for t in self.tools}
+        self._bedrock_tool_config = openai_tools_to_bedrock(self.tools)
+
+        # Span attributes that are the same on every invoke_agent span
+        self._static_invoke_attrs = {
+            "gen_ai.request.model": self.model,
+            "gen_ai.provider.name": self.provider,
+            "gen_ai.agent.id": self.agent_id,
+            "gen_ai.agent.description": self.agent_description,
+            "gen_ai.request.temperature": 0.7,
+            "gen_ai.request.max_tokens": 1024,
+            "gen_ai.output.type": "text",
+            "server.address": "api.openai.com",
+            "server.port": 443,
+        }
+
+        # Metric attribute sets are fixed per agent; build them once so each
+        # invoke reuses the same dicts (treat them as read-only)
+        mock_token_attrs = {
+            "gen_ai.operation.name": "invoke_agent",
+            "gen_ai.provider.name": "openai",
+            "gen_ai.request.model": self.model,
+            "gen_ai.response.model": MOCK_RESPONSE_MODEL,
+            "server.address": "api.openai.com",
+        }
+        self._token_attrs_input = {**mock_token_attrs, "gen_ai.token.type": "input"}
+        self._token_attrs_output = {**mock_token_attrs, "gen_ai.token.type": "output"}
+        self._op_duration_attrs = {
+            "openai": mock_token_attrs,
+            "aws_bedrock": BEDROCK_DURATION_ATTRS,
+        }
+
+    def _record_tokens(self, input_tokens: int, output_tokens: int, bedrock: bool = False) -> None:
+        """Record token usage against the prebuilt (stable) attribute sets."""
+        if bedrock:
+            input_attrs, output_attrs = BEDROCK_TOKEN_ATTRS_INPUT, BEDROCK_TOKEN_ATTRS_OUTPUT
+        else:
+            input_attrs, output_attrs = self._token_attrs_input, self._token_attrs_output
+        self.token_counter.add(input_tokens, attributes=input_attrs)
+        self.token_counter.add(output_tokens, attributes=output_attrs)
 
     def _should_inject_fault(self, fault: Optional[FaultConfig]) -> bool:
         if fault is None:
             return False
         return random.random() < fault.probability
 
-    def invoke(self, user_message: str, conversation_id: str, fault: Optional[FaultConfig] = None) -> str:
+    async def invoke(self, user_message: str, conversation_id: str, fault: Optional[FaultConfig] = None) -> str:
         """
         Invoke the agent with a user message.
 
         Uses observe() context manager + enrich() instead of manual span creation.
         """
-        start_time = time.time()
-        provider = SYSTEMS.get(self.model, "openai")
-
-        system_instructions = [
-            {"type": "text", "content": "You are a helpful weather assistant."}
-        ]
-
-        input_messages = [
-            {"role": "user", "parts": [{"type": "text", "content": user_message}]}
-        ]
+        start_time = time.monotonic()
+        # Check the fault type before rolling the dice so the common no-fault
+        # path never touches the RNG
+        fault_type = fault.type if fault else None
+
+        system_prompt = SYSTEM_INSTRUCTIONS[0]["content"]
+        llm_response = None
+        # One structured-log context per invocation; each log call adds its own
+        # fields. Logging copies extra into the record, so mutating is safe.
+        log_ctx = {
+            "gen_ai.operation.name": "invoke_agent",
+            "gen_ai.agent.id": self.agent_id,
+            "gen_ai.agent.name": self.agent_name,
+            "gen_ai.conversation.id": conversation_id,
+            "user_message": user_message,
+        }
 
         # Create invoke_agent span with observe() + enrich()
         with observe(self.agent_name, op=Op.INVOKE_AGENT, kind=SpanKind.CLIENT) as span:
+            # Sampled-out spans don't record, so skip building content payloads
+            capture_content = CAPTURE_MESSAGE_CONTENT and span.is_recording()
             try:
-                # enrich() sets all gen_ai.* attributes in one call
-                enrich(
-                    model=self.model,
-                    provider=provider,
-                    agent_id=self.agent_id,
-                    agent_description=self.agent_description,
-                    session_id=conversation_id,
-                    temperature=0.7,
-                    max_tokens=1024,
-                    system_instructions=json.dumps(system_instructions),
-                    tool_definitions=self.tools,
-                    input_messages=input_messages,
-                )
-                # Extra attributes not covered by enrich()
-                span.set_attribute("gen_ai.output.type", "text")
-                span.set_attribute("server.address", "api.openai.com")
-                span.set_attribute("server.port", 443)
-
-                self.logger.info(
-                    "Agent invoked",
-                    extra={
-                        "gen_ai.operation.name": "invoke_agent",
-                        "gen_ai.agent.id": self.agent_id,
-                        "gen_ai.agent.name": self.agent_name,
-                        "gen_ai.conversation.id": conversation_id,
-                        "user_message": user_message
-                    }
-                )
+                # Static agent/request attributes plus the conversation id in one call
+                span.set_attributes({**self._static_invoke_attrs, "gen_ai.conversation.id": conversation_id})
+                if capture_content:
+                    enrich(
+                        system_instructions=self._system_instructions_json,
+                        input_messages=[{"role": "user", "parts": [{"type": "text", "content": user_message}]}],
+                    )
+                    span.set_attribute("gen_ai.tool.definitions", self._tools_json)
+
+                # The span already marks the start; at INFO only the terminal
+                # record (completed or failed) is exported
+                self.logger.debug("Agent invoked", extra=log_ctx)
 
                 # Check for pre-LLM faults
-                if self._should_inject_fault(fault):
+                if fault_type is not None and self._should_inject_fault(fault):
                     if fault.delay_ms:
-                        time.sleep(fault.delay_ms / 1000)
+                        await asyncio.sleep(fault.delay_ms / 1000)
 
-                    if fault.type == "rate_limited":
+                    if fault_type == "rate_limited":
                         span.set_status(Status(StatusCode.ERROR, "Rate limit exceeded"))
                         span.set_attribute("error.type", "rate_limit_exceeded")
                         raise RateLimitError("Rate limit exceeded. Retry after 60 seconds.")
 
-                    if fault.type == "hallucination":
+                    if fault_type == "hallucination":
                         hallucinated_response = "The weather is 22°C and sunny with light winds."
                         enrich(
                             response_id=f"chatcmpl-hallucinated-{conversation_id[:8]}",
                             finish_reason="stop",
                             input_tokens=50,
                             output_tokens=20,
-                            output_messages=[{"role": "assistant", "parts": [{"type": "text", "content": hallucinated_response}], "finish_reason": "stop"}],
+                            output_messages=[{"role": "assistant", "parts": [{"type": "text", "content": hallucinated_response}], "finish_reason": "stop"}] if capture_content else None,
                         )
                         span.set_attribute("gen_ai.response.model", self.model)
                         span.set_status(Status(StatusCode.OK))
                         return hallucinated_response
 
                 # Prepare messages for LLM call
-                messages = [
-                    {"role": "system", "content": system_instructions[0]["content"]},
-                    {"role": "user", "content": user_message}
-                ]
+                messages = [SYSTEM_MESSAGE, {"role": "user", "content": user_message}]
 
                 # --- Bedrock path (real LLM) ---
                 if _config_cache["use_real_llm"] and _bedrock_client:
                     try:
                         bedrock_messages = [{"role": "user", "content": [{"text": user_message}]}]
-                        tool_config = openai_tools_to_bedrock(self.tools)
-                        bedrock_response = converse(
-                            _bedrock_client, bedrock_messages,
-                            system=system_instructions[0]["content"],
-                            tool_config=tool_config,
+                        # boto3 is blocking; run it off the event loop
+                        bedrock_response = await asyncio.to_thread(
+                            converse, _bedrock_client, bedrock_messages,
+                            system=system_prompt,
+                            tool_config=self._bedrock_tool_config,
                         )
                         usage = get_usage(bedrock_response)
                         enrich(
@@ -441,155 +684,154 @@ class WeatherAgent:
                             tool_args = tool_use["input"]
                             tool_use_id = tool_use["toolUseId"]
 
-                            if self._should_inject_fault(fault) and fault.type == "wrong_tool":
+                            if fault_type == "wrong_tool" and self._should_inject_fault(fault):
                                 wrong_tools = {"get_current_weather": "get_forecast", "get_forecast": "get_historical_weather", "get_historical_weather": "get_current_weather"}
                                 tool_name = wrong_tools.get(tool_name, tool_name)
 
-                            tool_result = self.execute_tool(tool_name, tool_args, tool_use_id, fault)
+                            tool_result = await self.execute_tool(tool_name, tool_args, tool_use_id, fault)
 
                             # Second Bedrock call with tool result for final answer
                             bedrock_messages.append(bedrock_response["output"]["message"])
                             bedrock_messages.append({"role": "user", "content": [{"toolResult": {"toolUseId": tool_use_id, "content": [{"json": tool_result}]}}]})
-                            final_response_obj = converse(_bedrock_client, bedrock_messages, system=system_instructions[0]["content"])
+                            final_response_obj = await asyncio.to_thread(converse, _bedrock_client, bedrock_messages, system=system_prompt)
                             final_response = extract_text(final_response_obj)
                             usage2 = get_usage(final_response_obj)
-                            self.token_counter.add(usage["input_tokens"] + usage2["input_tokens"], attributes={"gen_ai.token.type": "input", "gen_ai.provider.name": "aws_bedrock", "gen_ai.request.model": BEDROCK_MODEL_ID})
-                            self.token_counter.add(usage["output_tokens"] + usage2["output_tokens"], attributes={"gen_ai.token.type": "output", "gen_ai.provider.name": "aws_bedrock", "gen_ai.request.model": BEDROCK_MODEL_ID})
+                            self._record_tokens(usage["input_tokens"] + usage2["input_tokens"], usage["output_tokens"] + usage2["output_tokens"], bedrock=True)
                         else:
                             final_response = extract_text(bedrock_response)
 
                     except BedrockUnavailableError as e:
-                        span.set_attribute("gen_ai.bedrock.fallback", True)
-                        span.set_attribute("gen_ai.bedrock.fallback.reason", str(e)[:200])
+                        span.set_attributes({"gen_ai.bedrock.fallback": True, "gen_ai.bedrock.fallback.reason": str(e)[:200]})
                         # Fall through to mock path below
-                        llm_response = call_llm(self.model, messages, self.tools)
-                        tool_call = llm_response["choices"][0]["message"].get("tool_calls", [None])[0]
-                        if tool_call:
-                            tool_name = tool_call["function"]["name"]
-                            tool_args = json.loads(tool_call["function"]["arguments"])
-                            tool_result = self.execute_tool(tool_name, tool_args, tool_call["id"], fault)
-                            final_response = f"The weather in {tool_result.get('location', 'unknown')} is {tool_result.get('condition', 'unknown')} with a temperature of {tool_result.get('temperature', 'N/A')}."
+                        llm_response = await call_llm(self.model, messages, self.tools)
+                        usage = llm_response["usage"]
+                        tool_calls = llm_response["choices"][0]["message"].get("tool_calls") or []
+                        if tool_calls:
+                            tool_results = await asyncio.gather(*(
+                                self.execute_tool(tc["function"]["name"], orjson.loads(tc["function"]["arguments"]), tc["id"], fault)
+                                for tc in tool_calls
+                            ))
+                            final_response = " ".join(
+                                f"The weather in {r.get('location', 'unknown')} is {r.get('condition', 'unknown')} with a temperature of {r.get('temperature', 'N/A')}."
+                                for r in tool_results
+                            )
                         else:
                             final_response = "I couldn't determine what you're asking about."
-                        enrich(finish_reason="stop", input_tokens=llm_response["usage"]["prompt_tokens"], output_tokens=llm_response["usage"]["completion_tokens"])
+                        enrich(finish_reason="stop", input_tokens=usage["prompt_tokens"], output_tokens=usage["completion_tokens"])
                 else:
                     # --- Mock path ---
-                    llm_response = call_llm(self.model, messages, self.tools)
-
-                    if self._should_inject_fault(fault) and fault.type == "token_limit_exceeded":
-                        enrich(response_id=llm_response["id"], finish_reason="length", input_tokens=llm_response["usage"]["prompt_tokens"], output_tokens=1024)
-                        span.set_attribute("gen_ai.response.model", llm_response["model"])
+                    llm_response = await call_llm(self.model, messages, self.tools)
+                    choice = llm_response["choices"][0]
+                    response_model = llm_response["model"]
+                    prompt_tokens = llm_response["usage"]["prompt_tokens"]
+                    completion_tokens = llm_response["usage"]["completion_tokens"]
+
+                    if fault_type == "token_limit_exceeded" and self._should_inject_fault(fault):
+                        enrich(response_id=llm_response["id"], finish_reason="length", input_tokens=prompt_tokens, output_tokens=1024)
+                        span.set_attribute("gen_ai.response.model", response_model)
                         truncated_response = "The weather in the requested location is currently showing temperatures around—"
-                        enrich(output_messages=[{"role": "assistant", "parts": [{"type": "text", "content": truncated_response}], "finish_reason": "length"}])
+                        if capture_content:
+                            enrich(output_messages=[{"role": "assistant", "parts": [{"type": "text", "content": truncated_response}], "finish_reason": "length"}])
                         span.set_status(Status(StatusCode.OK))
                         return truncated_response
 
                     enrich(
                         response_id=llm_response["id"],
-                        finish_reason=llm_response["choices"][0]["finish_reason"],
-                        input_tokens=llm_response["usage"]["prompt_tokens"],
-                        output_tokens=llm_response["usage"]["completion_tokens"],
+                        finish_reason=choice["finish_reason"],
+                        input_tokens=prompt_tokens,
+                        output_tokens=completion_tokens,
                     )
-                    span.set_attribute("gen_ai.response.model", llm_response["model"])
-
-                    self.token_counter.add(llm_response["usage"]["prompt_tokens"], attributes={"gen_ai.operation.name": "invoke_agent", "gen_ai.provider.name": "openai", "gen_ai.request.model": self.model, "gen_ai.response.model": llm_response["model"], "gen_ai.token.type": "input", "server.address": "api.openai.com"})
-                    self.token_counter.add(llm_response["usage"]["completion_tokens"], attributes={"gen_ai.operation.name": "invoke_agent", "gen_ai.provider.name": "openai", "gen_ai.request.model": self.model, "gen_ai.response.model": llm_response["model"], "gen_ai.token.type": "output", "server.address": "api.openai.com"})
+                    span.set_attribute("gen_ai.response.model", response_model)
 
-                    tool_call = llm_response["choices"][0]["message"].get("tool_calls", [None])[0]
-                    tool_call_id = tool_call["id"] if tool_call else None
+                    self._record_tokens(prompt_tokens, completion_tokens)
 
-                    if tool_call:
-                        tool_name = tool_call["function"]["name"]
-                        tool_args = json.loads(tool_call["function"]["arguments"])
+                    tool_calls = choice["message"].get("tool_calls") or []
 
-                        if self._should_inject_fault(fault) and fault.type == "wrong_tool":
-                            wrong_tools = {"get_current_weather": "get_forecast", "get_forecast": "get_historical_weather", "get_historical_weather": "get_current_weather"}
-                            tool_name = wrong_tools.get(tool_name, tool_name)
-                            if tool_name == "get_historical_weather":
-                                tool_args["date"] = "2026-01-25"
-
-                        tool_result = self.execute_tool(tool_name, tool_args, tool_call_id, fault)
+                    if tool_calls:
+                        wrong_tool = fault_type == "wrong_tool" and self._should_inject_fault(fault)
+                        tasks = []
+                        for tool_call in tool_calls:
+                            tool_name = tool_call["function"]["name"]
+                            tool_args = orjson.loads(tool_call["function"]["arguments"])
 
-                        if "temperature" in tool_result:
-                            final_response = f"The weather in {tool_result['location']} is {tool_result['condition']} with a temperature of {tool_result['temperature']}."
-                        elif "forecast" in tool_result:
-                            days = tool_result["forecast"]
-                            final_response = f"Forecast for {tool_result['location']}: Day 1: {days[0]['condition']}, high {days[0]['high']}."
-                        elif "date" in tool_result:
-                            final_response = f"On {tool_result['date']} in {tool_result['location']}: {tool_result['condition']}, high {tool_result['high']}."
-                        else:
-                            final_response = f"Weather data for {tool_result.get('location', 'unknown')}: {tool_result}"
+                            if wrong_tool:
+                                wrong_tools = {"get_current_weather": "get_forecast", "get_forecast": "get_historical_weather", "get_historical_weather": "get_current_weather"}
+                                tool_name = wrong_tools.get(tool_name, tool_name)
+                                if tool_name == "get_historical_weather":
+                                    tool_args["date"] = "2026-01-25"
+
+                            tasks.append(self.execute_tool(tool_name, tool_args, tool_call["id"], fault))
+
+                        # Tool calls are independent, so run them concurrently. Each task
+                        # copies the current context, keeping its execute_tool span a
+                        # child of this invoke_agent span.
+                        tool_results = await asyncio.gather(*tasks)
+
+                        parts = []
+                        for tool_result in tool_results:
+                            if "temperature" in tool_result:
+                                parts.append(f"The weather in {tool_result['location']} is {tool_result['condition']} with a temperature of {tool_result['temperature']}.")
+                            elif "forecast" in tool_result:
+                                days = tool_result["forecast"]
+                                parts.append(f"Forecast for {tool_result['location']}: Day 1: {days[0]['condition']}, high {days[0]['high']}.")
+                            elif "date" in tool_result:
+                                parts.append(f"On {tool_result['date']} in {tool_result['location']}: {tool_result['condition']}, high {tool_result['high']}.")
+                            else:
+                                parts.append(f"Weather data for {tool_result.get('location', 'unknown')}: {tool_result}")
+                        final_response = " ".join(parts)
                     else:
                         final_response = "I couldn't determine what you're asking about."
 
                 # Record output messages via enrich()
-                enrich(output_messages=[
-                    {"role": "assistant", "parts": [{"type": "text", "content": final_response}], "finish_reason": "stop"}
-                ])
+                if capture_content:
+                    enrich(output_messages=[
+                        {"role": "assistant", "parts": [{"type": "text", "content": final_response}], "finish_reason": "stop"}
+                    ])
 
-                response_id = llm_response["id"] if "llm_response" in dir() and llm_response else f"bedrock-{uuid4().hex[:8]}"
-                response_model = llm_response["model"] if "llm_response" in dir() and llm_response else BEDROCK_MODEL_ID
+                response_id = llm_response["id"] if llm_response else f"bedrock-{uuid4().hex[:8]}"
+                response_model = llm_response["model"] if llm_response else BEDROCK_MODEL_ID
                 provider_name = "aws_bedrock" if (_config_cache["use_real_llm"] and _bedrock_client) else "openai"
 
-                self.logger.info(
-                    "Agent invocation completed",
-                    extra={
-                        "gen_ai.operation.name": "invoke_agent",
-                        "gen_ai.agent.id": self.agent_id,
-                        "gen_ai.response.id": response_id,
-                        "gen_ai.conversation.id": conversation_id,
-                        "response": final_response
-                    }
-                )
+                if self.logger.isEnabledFor(logging.INFO):
+                    log_ctx["gen_ai.response.id"] = response_id
+                    log_ctx["response"] = final_response
+                    self.logger.info("Agent invocation completed", extra=log_ctx)
 
-                duration = time.time() - start_time
-                self.operation_duration.record(
-                    duration,
-                    attributes={
-                        "gen_ai.operation.name": "invoke_agent",
-                        "gen_ai.provider.name": provider_name,
-                        "gen_ai.request.model": BEDROCK_MODEL_ID if provider_name == "aws_bedrock" else self.model,
-                        "gen_ai.response.model": response_model,
-                        "server.address": "bedrock-runtime.us-west-2.amazonaws.com" if provider_name == "aws_bedrock" else "api.openai.com"
-                    }
-                )
+                duration = time.monotonic() - start_time
+                duration_attrs = self._op_duration_attrs[provider_name]
+                if response_model != duration_attrs["gen_ai.response.model"]:
+                    # Bedrock fell back to the mock LLM mid-request
+                    duration_attrs = {**duration_attrs, "gen_ai.response.model": response_model}
+                self.operation_duration.record(duration, attributes=duration_attrs)
 
                 span.set_status(Status(StatusCode.OK))
                 return final_response
 
             except Exception as e:
-                self.logger.error(
-                    f"Agent invocation failed: {str(e)}",
-                    extra={
-                        "gen_ai.operation.name": "invoke_agent",
-                        "gen_ai.agent.id": self.agent_id,
-                        "gen_ai.conversation.id": conversation_id,
-                        "error": str(e)
-                    }
-                )
+                log_ctx["error"] = str(e)
+                self.logger.error("Agent invocation failed: %s", e, extra=log_ctx)
                 span.set_attribute("error.type", type(e).__name__)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
-                span.record_exception(e)
                 raise
 
-    def _call_mcp_tool(self, tool_name: str, arguments: dict, session_id: str) -> dict:
+    async def _call_mcp_tool(self, tool_name: str, arguments: dict, session_id: str) -> dict:
         """Call MCP server with proper CLIENT span and trace propagation."""
         request_id = uuid4().hex[:8]
 
         # Use observe() for the MCP span, with MCP-specific attributes set manually
         with observe(f"tools/call {tool_name}", kind=SpanKind.CLIENT) as span:
-            span.set_attribute("mcp.method.name", "tools/call")
-            span.set_attribute("mcp.session.id", session_id)
-            span.set_attribute("mcp.protocol.version", MCP_PROTOCOL_VERSION)
-            span.set_attribute("jsonrpc.request.id", request_id)
-            span.set_attribute("gen_ai.operation.name", "execute_tool")
-            span.set_attribute("gen_ai.tool.name", tool_name)
-            span.set_attribute("network.transport", "tcp")
-            span.set_attribute("network.protocol.name", "http")
-
-            enrich(
-                input_messages=[{"role": "tool_call", "parts": [{"type": "text", "content": json.dumps(arguments)}]}],
-            )
+            capture_content = CAPTURE_MESSAGE_CONTENT and span.is_recording()
+            span.set_attributes(MCP_CLIENT_SPAN_ATTRIBUTES)
+            span.set_attributes({
+                "mcp.session.id": session_id,
+                "jsonrpc.request.id": request_id,
+                "gen_ai.tool.name": tool_name,
+            })
+
+            if capture_content:
+                enrich(
+                    input_messages=[{"role": "tool_call", "parts": [{"type": "text", "content": _dumps(arguments)}]}],
+                )
 
             headers = {"mcp-session-id": session_id}
             inject(headers)
@@ -597,45 +839,54 @@ class WeatherAgent:
                 "jsonrpc": "2.0", "method": "tools/call", "id": request_id,
                 "params": {"name": tool_name, "arguments": arguments}
             }
-            resp = httpx.post(f"{MCP_SERVER_URL}/mcp", json=payload, headers=headers, timeout=30)
+            try:
+                resp = await _mcp_client.post(f"{MCP_SERVER_URL}/mcp", json=payload, headers=headers)
+                resp.raise_for_status()
+            except httpx.TimeoutException as e:
+                raise ToolTimeoutError(f"MCP server timed out calling {tool_name}") from e
+            except httpx.HTTPError as e:
+                raise ToolExecutionError(f"MCP server request failed for {tool_name}: {e}") from e
             data = resp.json()
             if "error" in data:
                 raise ToolExecutionError(data["error"].get("message", "MCP tool error"))
             tool_result = data.get("result", {})
 
-            enrich(
-                output_messages=[{"role": "tool_result", "parts": [{"type": "text", "content": json.dumps(tool_result)}]}],
-            )
+            if capture_content:
+                enrich(
+                    output_messages=[{"role": "tool_result", "parts": [{"type": "text", "content": _dumps(tool_result)}]}],
+                )
             return tool_result
 
-    def execute_tool(self, tool_name: str, arguments: Dict[str, Any], tool_call_id: str = None, fault: Optional[FaultConfig] = None) -> Dict[str, Any]:
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any], tool_call_id: str = None, fault: Optional[FaultConfig] = None) -> Dict[str, Any]:
         """
         Execute a tool with proper instrumentation.
 
         Uses observe() context manager + enrich() for the execute_tool span.
         """
         with observe(tool_name, op=Op.EXECUTE_TOOL) as span:
+            capture_content = CAPTURE_MESSAGE_CONTENT and span.is_recording()
             try:
                 # Set tool-specific attributes
-                span.set_attribute("gen_ai.tool.type", "function")
+                tool_attrs = {"gen_ai.tool.type": "function"}
                 if tool_call_id:
-                    span.set_attribute("gen_ai.tool.call.id", tool_call_id)
-
-                tool_def = next((t for t in self.tools if t["function"]["name"] == tool_name), None)
+                    tool_attrs["gen_ai.tool.call.id"] = tool_call_id
+                tool_def = self._tool_by_name.get(tool_name)
                 if tool_def:
-                    span.set_attribute("gen_ai.tool.description", tool_def["function"]["description"])
-                span.set_attribute("gen_ai.tool.call.arguments", json.dumps(arguments))
-
-                enrich(
-                    input_messages=[{"role": "tool_call", "parts": [{"type": "text", "content": json.dumps(arguments)}]}],
-                )
+                    tool_attrs["gen_ai.tool.description"] = tool_def["function"]["description"]
+                span.set_attributes(tool_attrs)
+                if capture_content:
+                    args_json = _dumps(arguments)
+                    span.set_attribute("gen_ai.tool.call.arguments", args_json)
+                    enrich(
+                        input_messages=[{"role": "tool_call", "parts": [{"type": "text", "content": args_json}]}],
+                    )
 
                 # Check for fault injection
-                if self._should_inject_fault(fault) and fault.type in ("tool_timeout", "tool_error", "high_latency"):
+                if fault is not None and fault.type in ("tool_timeout", "tool_error", "high_latency") and self._should_inject_fault(fault):
                     target_tool = fault.tool or tool_name
                     if target_tool == tool_name:
                         if fault.delay_ms:
-                            time.sleep(fault.delay_ms / 1000)
+                            await asyncio.sleep(fault.delay_ms / 1000)
                         if fault.type == "tool_timeout":
                             span.set_status(Status(StatusCode.ERROR, "Tool execution timed out"))
                             raise ToolTimeoutError(f"Tool '{tool_name}' timed out after 30000ms")
@@ -643,37 +894,34 @@ class WeatherAgent:
                             span.set_status(Status(StatusCode.ERROR, "Tool execution failed"))
                             raise ToolExecutionError(f"Tool '{tool_name}' failed: External API returned 503")
 
-                self.logger.info(f"Executing tool: {tool_name}")
+                self.logger.debug("Executing tool: %s", tool_name)
 
                 # Route to MCP server for weather API calls, local for others
                 session_id = uuid4().hex
                 if tool_name in ("get_current_weather", "get_weather"):
-                    result = self._call_mcp_tool("fetch_weather_api", {"location": arguments["location"]}, session_id)
-                elif tool_name == "get_forecast":
-                    with observe(f"local_tool {tool_name}") as local_span:
-                        local_span.set_attribute("gen_ai.tool.name", tool_name)
-                        local_span.set_attribute("tool.source", "local")
-                        result = get_forecast(arguments["location"], arguments.get("days", 3))
-                elif tool_name == "get_historical_weather":
-                    with observe(f"local_tool {tool_name}") as local_span:
-                        local_span.set_attribute("gen_ai.tool.name", tool_name)
-                        local_span.set_attribute("tool.source", "local")
-                        result = get_historical_weather(arguments["location"], arguments.get("date", "2026-01-01"))
+                    result = await self._call_mcp_tool("fetch_weather_api", {"location": arguments["location"]}, session_id)
                 else:
-                    raise ValueError(f"Unknown tool: {tool_name}")
-
-                span.set_attribute("gen_ai.tool.call.result", json.dumps(result))
-                enrich(
-                    output_messages=[{"role": "tool_result", "parts": [{"type": "text", "content": json.dumps(result)}]}],
-                )
+                    local_tool = LOCAL_TOOLS.get(tool_name)
+                    if local_tool is None:
+                        raise ValueError(f"Unknown tool: {tool_name}")
+                    span_name, run_tool = local_tool
+                    with observe(span_name) as local_span:
+                        local_span.set_attributes({"gen_ai.tool.name": tool_name, "tool.source": "local"})
+                        result = await run_tool(arguments)
+
+                if capture_content:
+                    result_json = _dumps(result)
+                    span.set_attribute("gen_ai.tool.call.result", result_json)
+                    enrich(
+                        output_messages=[{"role": "tool_result", "parts": [{"type": "text", "content": result_json}]}],
+                    )
                 span.set_status(Status(StatusCode.OK))
                 return result
 
             except Exception as e:
-                self.logger.error(f"Tool execution failed: {tool_name} - {str(e)}")
+                self.logger.error("Tool execution failed: %s - %s", tool_name, e)
                 span.set_attribute("error.type", type(e).__name__)
                 span.set_status(Status(StatusCode.ERROR, str(e)))
-                span.record_exception(e)
                 raise
 
 
@@ -687,7 +935,8 @@ def main():
     meter, logger = setup_telemetry(
         service_name="weather-agent",
         service_version="1.0.0",
-        otlp_endpoint="http://localhost:4317"
+        otlp_endpoint="http://localhost:4317",
+        demo_mode=True,
     )
     print("Telemetry configured")
     print()
@@ -704,12 +953,17 @@ def main():
     print()
 
     print("Invoking agent...")
-    response = agent.invoke(user_message, conversation_id)
+    response = asyncio.run(agent.invoke(user_message, conversation_id))
     print(f"Agent: {response}")
     print()
 
-    print("Waiting for telemetry export...")
-    time.sleep(3)
+    print("Flushing telemetry...")
+    # The batch processors export on background threads; flush them rather
+    # than sleeping and hoping the next export cycle has run
+    for provider in (trace.get_tracer_provider(), metrics.get_meter_provider(), get_logger_provider()):
+        # No-op providers (OTEL_SDK_DISABLED) have nothing to flush
+        if hasattr(provider, "force_flush"):
+            provider.force_flush(5000)
     print("Telemetry exported to Observability Stack")
     print()
 
@@ -6,34 +6,29 @@ FastAPI server that exposes the weather agent through REST API endpoints.
 Includes OpenTelemetry instrumentation for trace context propagation.
 """
 
-import json
+import hashlib
+import itertools
 import os
-import uuid
-from typing import Optional
-
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Tuple
+
+import orjson
+from fastapi import FastAPI
+from fastapi.responses import Response
+from pydantic import BaseModel
 from opentelemetry import trace as trace_api
 from opentelemetry.instrumentation.asgi import OpenTelemetryMiddleware
 
-from opensearch_genai_observability_sdk_py import enrich
-
-from main import WeatherAgent, setup_telemetry, FaultConfig, AgentError, SYSTEMS
+from main import WeatherAgent, setup_telemetry, FaultConfig, AgentError, CAPTURE_MESSAGE_CONTENT, _dumps, close_mcp_client
 
 
 # Request/Response models
-class FaultRequest(BaseModel):
-    type: str
-    delay_ms: int = 0
-    probability: float = 1.0
-    tool: Optional[str] = None
-
-
 class InvokeRequest(BaseModel):
     message: str
     conversation_id: Optional[str] = None
-    fault: Optional[FaultRequest] = None
+    # pydantic validates the agent's FaultConfig dataclass directly
+    fault: Optional[FaultConfig] = None
 
 
 class InvokeResponse(BaseModel):
@@ -49,17 +44,56 @@ class HealthResponse(BaseModel):
 
 # Setup telemetry BEFORE creating app
 otlp_endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
+otlp_protocol = "http" if os.getenv("OTEL_EXPORTER_OTLP_PROTOCOL", "grpc").startswith("http") else "grpc"
 meter, logger = setup_telemetry(
     service_name="weather-agent",
     service_version="1.0.0",
     otlp_endpoint=otlp_endpoint,
+    otlp_protocol=otlp_protocol,
 )
 
 # Create agent
 agent = WeatherAgent(meter, logger)
 
+# Fallback conversation ids only need to be unique, not unguessable: a random
+# per-process prefix keeps workers apart and a counter numbers requests
+CONVERSATION_ID_PREFIX = f"conv_{os.urandom(4).hex()}"
+_next_conversation_number = itertools.count().__next__
+
+# gen_ai attributes promoted to the root HTTP span; invariant for the process
+ROOT_SPAN_ATTRIBUTES = {
+    "gen_ai.request.model": agent.model,
+    "gen_ai.provider.name": agent.provider,
+    "gen_ai.agent.name": agent.agent_name,
+    "gen_ai.operation.name": "invoke_agent",
+}
+
+# Message envelopes are fixed; only the JSON-escaped text content varies
+INPUT_MESSAGES_TEMPLATE = '[{"role":"user","parts":[{"type":"text","content":%s}]}]'
+OUTPUT_MESSAGES_TEMPLATE = '[{"role":"assistant","parts":[{"type":"text","content":%s}]}]'
+
+# Repeated prompts can be answered from a short-lived cache. Off by default:
+# every request is meant to produce a full agent trace
+RESPONSE_CACHE_TTL = float(os.getenv("WEATHER_AGENT_RESPONSE_CACHE_TTL", "0"))
+RESPONSE_CACHE_MAX_SIZE = 4096
+_response_cache: Dict[bytes, Tuple[float, str]] = {}
+
+# The health payload is fixed once the agent exists; probes get the cached bytes
+HEALTH_BODY = orjson.dumps({"status": "healthy", "agent_id": agent.agent_id, "agent_name": agent.agent_name})
+
+# Unexpected failures get a fixed body; the details go to the log instead
+INTERNAL_ERROR_BODY = orjson.dumps({"detail": "Agent invocation failed"})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # The MCP client is shared by every request; release its pooled connections on shutdown
+    await close_mcp_client()
+
+
 # Create inner FastAPI app
-inner_app = FastAPI(title="Weather Agent API", version="1.0.0")
+inner_app = FastAPI(title="Weather Agent API", version="1.0.0", lifespan=lifespan)
 
 logger.info("Weather Agent API server started", extra={"otlp_endpoint": otlp_endpoint})
 
@@ -71,54 +105,77 @@ async def root():
 
 @inner_app.get("/health", response_model=HealthResponse)
 async def health():
-    return HealthResponse(status="healthy", agent_id=agent.agent_id, agent_name=agent.agent_name)
+    return Response(content=HEALTH_BODY, media_type="application/json")
+
+
+def invoke_response(response: str, conversation_id: str) -> Response:
+    """Serialize an InvokeResponse payload directly, skipping response_model validation."""
+    return Response(
+        content=orjson.dumps({"response": response, "conversation_id": conversation_id}),
+        media_type="application/json",
+    )
 
 
+# response_model only documents the schema; handlers return ready-made Responses
 @inner_app.post("/invoke", response_model=InvokeResponse)
 async def invoke(request: InvokeRequest):
-    conversation_id = request.conversation_id or f"conv_{uuid.uuid4().hex[:12]}"
-
-    fault_config = None
-    if request.fault:
-        fault_config = FaultConfig(
-            type=request.fault.type,
-            delay_ms=request.fault.delay_ms,
-            probability=request.fault.probability,
-            tool=request.fault.tool
-        )
+    conversation_id = request.conversation_id or f"{CONVERSATION_ID_PREFIX}{_next_conversation_number():x}"
+
+    fault_config = request.fault
 
     # Promote gen_ai attributes to the root HTTP span so the UI can read them
-    enrich(
-        model=agent.model,
-        provider=SYSTEMS.get(agent.model, "openai"),
-        input_messages=[{"role": "user", "parts": [{"type": "text", "content": request.message}]}],
-    )
     root_span = trace_api.get_current_span()
-    root_span.set_attribute("gen_ai.agent.name", agent.agent_name)
-    root_span.set_attribute("gen_ai.operation.name", "invoke_agent")
+    root_span.set_attributes(ROOT_SPAN_ATTRIBUTES)
+
+    # Faulted requests exercise error paths and are never served from cache
+    cache_key = None
+    if RESPONSE_CACHE_TTL > 0 and fault_config is None:
+        cache_key = hashlib.sha256(f"{agent.model}|{request.message}".encode()).digest()
+        cached = _response_cache.get(cache_key)
+        if cached is not None and cached[0] > time.monotonic():
+            root_span.set_attribute("gen_ai.cache_hit", True)
+            return invoke_response(cached[1], conversation_id)
+
+    # Unsampled spans drop attributes anyway; skip serializing the payloads
+    capture_content = CAPTURE_MESSAGE_CONTENT and root_span.is_recording()
+    if capture_content:
+        root_span.set_attribute("gen_ai.input.messages", INPUT_MESSAGES_TEMPLATE % _dumps(request.message))
 
     try:
-        response = agent.invoke(request.message, conversation_id, fault_config)
+        response = await agent.invoke(request.message, conversation_id, fault_config)
         # Set output on the parent HTTP request span. agent.invoke() runs inside
-        # its own observe() block, so by the time we return here the current
-        # span is the HTTP request span — enrich() intentionally targets it.
-        enrich(
-            output_messages=[{"role": "assistant", "parts": [{"type": "text", "content": response}]}],
-        )
-        return InvokeResponse(response=response, conversation_id=conversation_id)
+        # its own observe() block and has ended by the time we return here, so
+        # root_span is still the HTTP request span.
+        if capture_content:
+            root_span.set_attribute("gen_ai.output.messages", OUTPUT_MESSAGES_TEMPLATE % _dumps(response))
+        if cache_key is not None:
+            if len(_response_cache) >= RESPONSE_CACHE_MAX_SIZE and cache_key not in _response_cache:
+                # Dicts keep insertion order, so the first key is the oldest entry
+                del _response_cache[next(iter(_response_cache))]
+            _response_cache[cache_key] = (time.monotonic() + RESPONSE_CACHE_TTL, response)
+        return invoke_response(response, conversation_id)
     except AgentError as e:
-        return JSONResponse(
+        return Response(
+            content=orjson.dumps({"response": None, "error": {"type": e.error_type, "message": str(e)}, "conversation_id": conversation_id}),
             status_code=e.status_code,
-            content={"response": None, "error": {"type": e.error_type, "message": str(e)}, "conversation_id": conversation_id}
+            media_type="application/json",
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Agent invocation failed: {str(e)}")
+    except Exception:
+        logger.exception("Agent invocation failed", extra={"conversation_id": conversation_id})
+        return Response(content=INTERNAL_ERROR_BODY, status_code=500, media_type="application/json")
 
 
-# Wrap with OpenTelemetry middleware for trace context propagation
-app = OpenTelemetryMiddleware(inner_app)
+# Wrap with OpenTelemetry middleware for trace context propagation. Probe and
+# banner requests (/health, /) carry no agent work, so they get no span
+EXCLUDED_URLS = os.getenv("OTEL_PYTHON_EXCLUDED_URLS", r"/health$,://[^/]+/$")
+app = OpenTelemetryMiddleware(inner_app, excluded_urls=EXCLUDED_URLS)
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    if os.getenv("DEBUG"):
+        # Auto-reload needs an import string; local development only
+        uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
+    else:
+        # Every request is already recorded as a span; skip uvicorn's access log line
+        uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools", log_level="info", access_log=False)
@@ -8,6 +8,7 @@ StrandsTelemetry automatically applies OpenTelemetry GenAI Semantic Conventions.
 """
 
 import os
+from grpc import Compression
 from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
     OTLPSpanExporter as GRPCSpanExporter,
 )
@@ -58,6 +59,8 @@ telemetry = StrandsTelemetry()
 # Configuration details:
 # - endpoint: OTLP collector gRPC endpoint (localhost:4317)
 # - insecure: Use insecure connection (no TLS) for local development
+# - compression: gzip each export; span payloads are repetitive JSON
+#   (message arrays, tool arguments/results) and shrink several-fold
 #
 # In production, you would:
 # - Use a secure endpoint with TLS
@@ -65,7 +68,8 @@ telemetry = StrandsTelemetry()
 # - Set appropriate timeout and retry policies
 grpc_exporter = GRPCSpanExporter(
     endpoint="localhost:4317",
-    insecure=True
+    insecure=True,
+    compression=Compression.Gzip,
 )
 
 # Add the OTLP exporter to the tracer provider using BatchSpanProcessor
@@ -74,13 +78,28 @@ grpc_exporter = GRPCSpanExporter(
 # - Configurable batch size and timeout
 # - Handles export failures with retry logic
 #
+# BatchSpanProcessor settings are tuned for bursty tool-call traffic; the
+# standard OTEL_BSP_* environment variables override each default:
+# - OTEL_BSP_MAX_QUEUE_SIZE: 4096 spans buffered before new spans are dropped
+# - OTEL_BSP_SCHEDULE_DELAY: export every 1s so traces show up quickly
+# - OTEL_BSP_MAX_EXPORT_BATCH_SIZE: 128 spans per export request; agent spans
+#   carry full message and tool payloads, and larger batches can exceed
+#   gRPC's 4MB default message size and be rejected whole
+# - OTEL_BSP_EXPORT_TIMEOUT: give up on an export after 10s
+#
 # The telemetry data flow:
 # 1. Strands agent operations create spans
 # 2. BatchSpanProcessor collects spans in memory
 # 3. Periodically exports batches to OTLP collector
 # 4. OTLP collector processes and routes to OpenSearch via Data Prepper
 telemetry.tracer_provider.add_span_processor(
-    BatchSpanProcessor(grpc_exporter)
+    BatchSpanProcessor(
+        grpc_exporter,
+        max_queue_size=int(os.getenv("OTEL_BSP_MAX_QUEUE_SIZE", "4096")),
+        schedule_delay_millis=int(os.getenv("OTEL_BSP_SCHEDULE_DELAY", "1000")),
+        max_export_batch_size=int(os.getenv("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", "128")),
+        export_timeout_millis=int(os.getenv("OTEL_BSP_EXPORT_TIMEOUT", "10000")),
+    )
 )
 
 # ============================================================================